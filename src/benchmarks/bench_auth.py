@@ -0,0 +1,64 @@
+"""Сравнение старой (три запроса) и новой (один запрос) авторизации
+
+Запуск из каталога src:
+    python -m benchmarks.bench_auth --latency 0.5 --scale 100
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.standin import StandinDatabase, read_csv, seed
+
+LEGACY_QUERIES = [
+    ("moderator", "SELECT * FROM модераторы WHERE почта = %s AND пароль = %s"),
+    ("organizer", "SELECT * FROM организаторы WHERE почта = %s AND пароль = %s"),
+    ("participant", "SELECT * FROM участники WHERE почта = %s AND пароль = %s"),
+]
+
+
+def legacy_auth_user(db, email, password):
+    """Прежняя авторизация: до трёх последовательных запросов"""
+    for role, query in LEGACY_QUERIES:
+        user = db._execute(query, (email, password), fetch="one")
+        if user:
+            return {"role": role, "data": user}
+    return None
+
+
+def timed(func, credentials, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for email, password in credentials:
+            func(email, password)
+    elapsed = time.perf_counter() - start
+    return elapsed, repeat * len(credentials) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10, help="число копий пользователей из CSV")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="имитация задержки сети на запрос, мс")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite3"
+        seed(path, scale=args.scale)
+        db = StandinDatabase(path, latency=args.latency / 1000,
+                             schema_cache_path=Path(tmp) / "schema_cache.json")
+
+        # Участники — худший случай для старого пути
+        credentials = [(r["Почта"], r["пароль"]) for r in read_csv("участники.csv") if r.get("ФИО")]
+        assert all(legacy_auth_user(db, e, p)["role"] == db.auth_user(e, p)["role"] for e, p in credentials)
+
+        for name, func in (("legacy (3 запроса)", lambda e, p: legacy_auth_user(db, e, p)),
+                           ("union all (1 запрос)", db.auth_user)):
+            elapsed, rate = timed(func, credentials, args.repeat)
+            print(f"{name:22} {elapsed:8.3f} c  {rate:10.1f} входов/с")
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
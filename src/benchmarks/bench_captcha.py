@@ -0,0 +1,102 @@
+"""Задержка сброса капчи: прежний путь (чтение, нарезка, PhotoImage) и PuzzleCaptcha.reset_parts
+
+Запуск из каталога src:
+    python -m benchmarks.bench_captcha --repeat 200
+Сброс замеряется на настоящем PuzzleCaptcha при наличии дисплея или Xvfb
+(см. benchmarks.suite); без них — только нарезка TileSet и кэш фрагментов.
+"""
+import argparse
+import random
+import time
+import tkinter as tk
+from pathlib import Path
+
+from PIL import Image, ImageTk
+
+from benchmarks.suite import display
+from utils.captcha_assets import TileSet, get_tileset
+from utils.captcha_pool import PuzzlePool
+
+IMAGE_PATH = Path(__file__).resolve().parents[1] / "captcha_images" / "i.png"
+
+
+def legacy_reset(canvas, path):
+    """Прежний reset_parts: файл открывается и режется заново"""
+    canvas.delete("all")
+    image = Image.open(path)
+    width, height = image.size
+    part_width, part_height = width // 2, height // 2
+    coords = [
+        (0, 0, part_width, part_height),
+        (part_width, 0, width, part_height),
+        (0, part_height, part_width, height),
+        (part_width, part_height, width, height),
+    ]
+    parts = []
+    for box in coords:
+        tk_part = ImageTk.PhotoImage(image.crop(box))
+        parts.append(tk_part)
+        canvas.create_image(random.randint(0, 250), random.randint(0, 250), image=tk_part, anchor='nw')
+    return parts
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def time_resets(args):
+    """Прежний сброс и PuzzleCaptcha.reset_parts с заранее заполненным пулом"""
+    from main import PuzzleCaptcha
+    from utils.executor import TkExecutor
+
+    root = tk.Tk()
+    root.withdraw()
+    executor = TkExecutor(root)
+    # Варианты на все повторы готовятся заранее: замеряется сам сброс, а не генерация
+    pool = PuzzlePool(Path(args.image).parent, capacity=args.repeat + 1,
+                      canvas_size=PuzzleCaptcha.CANVAS_SIZE).start()
+    try:
+        canvas = tk.Canvas(root, width=300, height=300)
+        canvas.pack()
+        legacy_ms = timed(lambda: legacy_reset(canvas, args.image), args.repeat)
+        canvas.destroy()
+
+        deadline = time.perf_counter() + 30
+        while len(pool) < args.repeat + 1 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        pool.stop()
+        captcha = PuzzleCaptcha(root, pool, executor, on_fail=lambda: None, on_success=lambda: None)
+        captcha.pack()
+        reset_ms = timed(captcha.reset_parts, args.repeat)
+    finally:
+        pool.stop()
+        executor.shutdown()
+        root.destroy()
+    return legacy_ms, reset_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--image", default=str(IMAGE_PATH))
+    args = parser.parse_args()
+
+    print(f"{'нарезка (TileSet)':28} {timed(lambda: TileSet(args.image), args.repeat):8.3f} мс")
+    print(f"{'кэш фрагментов':28} {timed(lambda: get_tileset(args.image), args.repeat):8.3f} мс")
+
+    try:
+        with display():
+            legacy_ms, reset_ms = time_resets(args)
+    except Exception as e:
+        print(f"Дисплей недоступен: замер reset_parts пропущен ({type(e).__name__}: {e})")
+        return
+
+    print(f"{'reset_parts (прежний)':28} {legacy_ms:8.3f} мс")
+    print(f"{'reset_parts (PuzzleCaptcha)':28} {reset_ms:8.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
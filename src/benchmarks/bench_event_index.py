@@ -0,0 +1,64 @@
+"""Поиск и фильтры по загруженным мероприятиям (EventIndex)
+
+Запуск из каталога src:
+    python -m benchmarks.bench_event_index --events 10000 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from utils.event_index import EventIndex
+
+WORDS = ("конференция", "форум", "митап", "хакатон", "облачные", "сети", "безопасность",
+         "данные", "кластер", "инфраструктура", "DevOps", "мониторинг", "виртуализация")
+
+QUERIES = {
+    'название': dict(text='хака'),
+    'название + город': dict(text='облач сети', city='5'),
+    'диапазон дат': dict(date_from='01.01.2022', date_to='2022-03-01'),
+    'длительность + сорт.': dict(days=3, sort='title'),
+    'все условия': dict(text='форум', city='7', date_from='2021-01-01', days=2),
+}
+
+
+def make_events(count, seed=1):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    events = [{
+        '№': number,
+        'Событие': ' '.join(rng.sample(WORDS, 3)),
+        'DATE': start + timedelta(days=rng.randint(0, 1500)),
+        'DAYS': rng.randint(1, 5),
+        'Город': rng.randint(1, 300),
+    } for number in range(1, count + 1)]
+    events.sort(key=lambda e: (e['DATE'], e['№']))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.events:
+        events = make_events(count)
+        start = time.perf_counter()
+        index = EventIndex()
+        for offset in range(0, count, args.page_size):
+            index.add(events[offset:offset + args.page_size])
+        print(f"{count} мероприятий: построение {(time.perf_counter() - start) * 1000:.1f} мс")
+
+        for name, query in QUERIES.items():
+            found = len(index.search(**query))
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                index.search(**query)
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"  {name:22} {elapsed:8.2f} мс  найдено {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Пропускная способность входа с хешированием паролей (scrypt)
+
+Запуск из каталога src:
+    python -m benchmarks.bench_passwords --n 16384 --threads 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.passwords import SCRYPT_N, SCRYPT_P, SCRYPT_R, PasswordHasher, check_password, hash_password
+
+
+def rate(func, count, threads=1):
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(count):
+            func()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(func) for _ in range(count)]:
+                future.result()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=SCRYPT_N)
+    parser.add_argument("--r", type=int, default=SCRYPT_R)
+    parser.add_argument("--p", type=int, default=SCRYPT_P)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    stored = hash_password("пароль", n=args.n, r=args.r, p=args.p)
+    print(f"scrypt n={args.n} r={args.r} p={args.p}")
+    print(f"{'проверка, 1 поток':32} {rate(lambda: check_password('пароль', stored), args.count):10.1f} входов/с")
+    print(f"{f'проверка, {args.threads} потоков':32} "
+          f"{rate(lambda: check_password('пароль', stored), args.count, args.threads):10.1f} входов/с")
+
+    hasher = PasswordHasher(cache_ttl=60)
+    hasher.verify("пароль", stored)
+    print(f"{'повторный вход (кэш)':32} {rate(lambda: hasher.verify('пароль', stored), args.count * 100):10.1f} входов/с")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
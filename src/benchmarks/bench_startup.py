@@ -0,0 +1,80 @@
+"""Время запуска: импорт main (python -X importtime) и первая отрисовка окна входа
+
+Запуск из каталога src:
+    python -m benchmarks.bench_startup --repeat 5 --target-ms 300
+Без дисплея замеряется только импорт.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Модули, которые не должны загружаться до показа окна
+DEFERRED_MODULES = ('mysql', 'PIL')
+
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+import main
+app = main.App()
+app.update()
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+app.destroy()
+"""
+
+
+def import_times():
+    """Разбор вывода -X importtime: модуль -> (собственное, накопленное) время в мкс"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def first_paint_ms():
+    """Время от начала импорта до отрисованного окна входа или None без дисплея"""
+    result = subprocess.run([sys.executable, "-c", FIRST_PAINT], cwd=SRC_DIR,
+                            capture_output=True, text=True, env=os.environ)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=300.0, help="цель для первой отрисовки")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.repeat)]
+    times = min(runs, key=lambda t: t["main"][1])
+    print(f"import main: {times['main'][1] / 1000:.1f} мс (лучший из {args.repeat})")
+    for name, (_, cumulative) in sorted(times.items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+        print(f"  {name:40} {cumulative / 1000:8.1f} мс")
+
+    loaded = [m for m in DEFERRED_MODULES if m in times]
+    if loaded:
+        print(f"При импорте main загружаются отложенные модули: {', '.join(loaded)}")
+
+    paints = [first_paint_ms() for _ in range(args.repeat)]
+    if None in paints:
+        print("Дисплей недоступен: замер первой отрисовки пропущен")
+        return 1 if loaded else 0
+
+    best = min(paints)
+    verdict = "в норме" if best <= args.target_ms else "превышает цель"
+    print(f"первая отрисовка: {best:.1f} мс (цель {args.target_ms:.0f} мс) — {verdict}")
+    return 1 if loaded or best > args.target_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Синтетический набор данных в формате import_csv для замеров
+
+Запуск из каталога src:
+    python -m benchmarks.datagen --size 100k --out /tmp/bench_csv
+    python -m benchmarks.datagen --events 50000 --users 2000 --seed 7
+
+При одинаковых параметрах и seed файлы получаются одинаковыми.
+"""
+import argparse
+import csv
+import random
+import shutil
+import string
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.standin import CSV_DIR, read_csv
+from utils.event_index import MONTHS
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+EVENTS_FILE = "Мероприятия_IT-инфраструктура.csv"
+ACTIVITIES_FILE = "Активности_import.csv"
+# Справочники копируются без изменений
+STATIC_FILES = ("Cтраны_import.csv", "Город_import.csv")
+# Файл пользователей -> (роль для почты, доля от всех пользователей, как в import_csv)
+USER_FILES = {
+    "Модераторы.csv": ("moderator", 21 / 124),
+    "жюри.csv": ("jury", 13 / 124),
+    "организаторы.csv": ("organizer", 10 / 124),
+    "участники.csv": ("participant", 80 / 124),
+}
+PASSWORD_CHARS = string.ascii_letters + string.digits
+
+
+def header(name, csv_dir=CSV_DIR):
+    with open(Path(csv_dir) / name, encoding="cp1251", newline="") as f:
+        return next(csv.reader(f, delimiter=";"))
+
+
+def writer(path, fieldnames):
+    f = open(path, "w", encoding="cp1251", newline="")
+    out = csv.DictWriter(f, fieldnames=fieldnames, delimiter=";", extrasaction="ignore")
+    out.writeheader()
+    return f, out
+
+
+def email_field(fieldnames):
+    return "почта" if "почта" in fieldnames else "Почта"
+
+
+def event_date(value):
+    """Дата в формате исходного файла: «3 апреля 2022 г.»"""
+    return f"{value.day} {MONTHS[value.month - 1]} {value.year} г."
+
+
+def split_users(users):
+    """Число пользователей каждого файла пропорционально import_csv"""
+    counts = {name: max(1, int(users * share)) for name, (_, share) in USER_FILES.items()}
+    counts["участники.csv"] += users - sum(counts.values())
+    return counts
+
+
+def generate_users(rng, out_dir, name, count, role):
+    """Пользователи: ФИО из частей настоящих ФИО, уникальная почта, случайный пароль"""
+    templates = [r for r in read_csv(name) if r.get("ФИО")]
+    parts = [r["ФИО"].split() for r in templates if len(r["ФИО"].split()) == 3]
+    surnames, first_names, patronymics = zip(*parts)
+    fieldnames = header(name)
+    email = email_field(fieldnames)
+
+    names = []
+    f, out = writer(Path(out_dir) / name, fieldnames)
+    with f:
+        for number in range(1, count + 1):
+            row = dict(rng.choice(templates))
+            row["ФИО"] = f"{rng.choice(surnames)} {rng.choice(first_names)} {rng.choice(patronymics)}"
+            row[email] = f"{role}{number}@example.com"
+            row["пароль"] = "".join(rng.choices(PASSWORD_CHARS, k=rng.randint(6, 10)))
+            out.writerow(row)
+            names.append(row["ФИО"])
+    return names
+
+
+def generate_events(rng, out_dir, count):
+    """Мероприятия: названия из import_csv, случайные даты, длительность и город"""
+    titles = [r["Событие"].strip() for r in read_csv(EVENTS_FILE) if r.get("Событие")]
+    with open(CSV_DIR / "Город_import.csv", encoding="cp1251") as f:
+        city_count = sum(1 for _ in f)
+    start = date(2020, 1, 1)
+
+    events = []
+    f, out = writer(Path(out_dir) / EVENTS_FILE, header(EVENTS_FILE))
+    with f:
+        for number in range(1, count + 1):
+            day = start + timedelta(days=rng.randint(0, 6 * 365))
+            row = {
+                "№": number,
+                "Событие": rng.choice(titles),
+                "DATE": event_date(day),
+                "DAYS": rng.randint(1, 3),
+                "Город": rng.randint(1, city_count),
+            }
+            out.writerow(row)
+            if len(events) < 1000:
+                events.append({**row, "start": day})
+    return events
+
+
+def generate_activities(rng, out_dir, events, users, per_event=5):
+    """Иерархический файл активностей для первых мероприятий"""
+    activities = [r["Активность"] for r in read_csv(ACTIVITIES_FILE) if r.get("Активность")]
+    moderators, jury = users["Модераторы.csv"], users["жюри.csv"]
+    participants = users["участники.csv"]
+
+    f, out = writer(Path(out_dir) / ACTIVITIES_FILE, header(ACTIVITIES_FILE))
+    with f:
+        for event in events:
+            out.writerow({
+                "№": event["№"],
+                "Наименование мероприятия": event["Событие"],
+                # В файле активностей дата записана как ДД.ММ.ГГГГ
+                "Дата начала": event["start"].strftime("%d.%m.%Y"),
+                "Дни": event["DAYS"],
+                "Победитель": rng.choice(participants),
+            })
+            for index in range(per_event):
+                row = {
+                    "Активность": rng.choice(activities),
+                    "День": 1 + index * event["DAYS"] // per_event,
+                    "Время начала": f"{9 + index * 2}:00",
+                    "Модератор": rng.choice(moderators),
+                }
+                for number in range(1, 6):
+                    row[f"Жюри {number}"] = rng.choice(jury)
+                out.writerow(row)
+
+
+def generate(out_dir, events, users=None, seed=42):
+    """Запись набора в out_dir; возвращает число строк по файлам"""
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name in STATIC_FILES:
+        shutil.copyfile(CSV_DIR / name, out_dir / name)
+
+    counts = split_users(users if users is not None else events)
+    names = {name: generate_users(rng, out_dir, name, count, USER_FILES[name][0])
+             for name, count in counts.items()}
+    generate_activities(rng, out_dir, generate_events(rng, out_dir, events), names)
+    return {**counts, EVENTS_FILE: events}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=list(SIZES), default="10k")
+    parser.add_argument("--events", type=int, help="число мероприятий (вместо --size)")
+    parser.add_argument("--users", type=int, help="число пользователей (по умолчанию как мероприятий)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.out, args.events or SIZES[args.size], args.users, args.seed)
+    for name, count in counts.items():
+        print(f"{name:40} {count:10}")
+    print(f"Готово за {time.perf_counter() - start:.1f} c: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
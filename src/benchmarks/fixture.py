@@ -0,0 +1,97 @@
+"""Подготовка базы для замеров: синтетический набор во встроенном SQLite или в локальном MySQL"""
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datagen import SIZES, generate
+from benchmarks.standin import read_csv
+from utils.database import Database, MySQLBackend, SQLiteBackend
+
+DATA_DIR = Path(__file__).resolve().parents[2] / ".bench_data"
+
+
+def dataset(size, seed_value=42, data_dir=DATA_DIR):
+    """Каталог с набором CSV; создаётся один раз на (размер, seed)"""
+    path = Path(data_dir) / f"{size}-{seed_value}"
+    marker = path / ".complete"
+    if not marker.exists():
+        if path.exists():
+            shutil.rmtree(path)
+        generate(path, SIZES[size], seed=seed_value)
+        marker.touch()
+    return path
+
+
+class Fixture:
+    """Набор данных, загруженный в базу, и выборки для сценариев
+
+    backend="sqlite" — SQLiteBackend с файлом рядом с набором (создаётся один раз);
+    backend="mysql" — таблицы базы из config перезаписываются набором через
+    utils.importer, поэтому по умолчанию используется отдельная база test_exam_bench
+    со схемой test_exam.
+    """
+
+    def __init__(self, size="10k", backend="sqlite", seed_value=42, latency=0.0,
+                 database="test_exam_bench", data_dir=DATA_DIR):
+        self.size = size
+        self.backend = backend
+        self.seed = seed_value
+        self.latency = latency
+        self.database = database
+        self.csv_dir = dataset(size, seed_value, data_dir)
+        self.load_seconds = None
+        self.db = None
+        self._tmp = None
+
+    def __enter__(self):
+        start = time.perf_counter()
+        # Свой кэш схемы: замеры не трогают .schema_cache.json приложения
+        self._tmp = tempfile.TemporaryDirectory(prefix="bench_schema_")
+        schema_cache_path = Path(self._tmp.name) / "schema_cache.json"
+        if self.backend == "sqlite":
+            # Пароли в наборе открытые, как и при загрузке в MySQL
+            backend = SQLiteBackend(self.csv_dir / "store.sqlite3", csv_dir=self.csv_dir,
+                                    hash_passwords=False, latency=self.latency)
+            backend.ensure_built()
+            self.db = Database(backend=backend, schema_cache_path=schema_cache_path)
+        else:
+            self.db = self._load_mysql(schema_cache_path)
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    def __exit__(self, *exc):
+        if self.db is not None:
+            self.db.disconnect()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def _load_mysql(self, schema_cache_path):
+        import mysql.connector
+
+        from utils.database import DB_CONFIG
+        from utils.importer import TABLES, import_all
+
+        config = {**DB_CONFIG, 'database': self.database}
+        con = mysql.connector.connect(**config)
+        try:
+            # Пароли в наборе открытые: хеширование миллиона строк заняло бы часы
+            import_all(con, TABLES, truncate=True, csv_dir=self.csv_dir, hash_passwords=False)
+        finally:
+            con.close()
+        return Database(backend=MySQLBackend(**config), schema_cache_path=schema_cache_path)
+
+    def credentials(self, count=200):
+        """Почта и пароль пользователей, равномерно по всему набору"""
+        rows = []
+        for name, email in (("Модераторы.csv", "почта"), ("организаторы.csv", "Почта"),
+                            ("участники.csv", "Почта")):
+            users = [(r[email], r["пароль"]) for r in read_csv(name, self.csv_dir)]
+            step = max(1, len(users) * 3 // count)
+            rows.extend(users[::step])
+        return rows[:count]
+
+    def event_ids(self, count=200):
+        total = SIZES[self.size]
+        step = max(1, total // count)
+        return list(range(1, total + 1, step))[:count]
@@ -0,0 +1,46 @@
+"""Небольшая база SQLite из import_csv для замеров входа с размноженными пользователями"""
+import csv
+import sqlite3
+from pathlib import Path
+
+from utils.database import Database, SQLiteBackend
+
+CSV_DIR = Path(__file__).resolve().parents[2] / "import_csv"
+
+# Таблицы, в которых ищет вход (AUTH_QUERY)
+USER_TABLES = ("модераторы", "организаторы", "участники")
+
+
+class StandinDatabase(Database):
+    """Database поверх готового файла SQLite (см. seed)"""
+
+    def __init__(self, path, latency=0.0, **kwargs):
+        super().__init__(backend=SQLiteBackend(path, csv_dir=None, latency=latency), **kwargs)
+
+
+def read_csv(name, csv_dir=CSV_DIR):
+    """Чтение файла из import_csv (cp1251, разделитель ';')"""
+    with open(Path(csv_dir) / name, encoding="cp1251", newline="") as f:
+        yield from csv.DictReader(f, delimiter=";")
+
+
+def seed(path, scale=1, csv_dir=CSV_DIR):
+    """База SQLite из import_csv (схема и индексы utils.database.sqlite)
+
+    Пароли не хешируются, чтобы их можно было сравнить и прежним запросом
+    входа. Пользователи размножаются scale раз: у копий почта с префиксом
+    «номер.».
+    """
+    SQLiteBackend(path, csv_dir=csv_dir, hash_passwords=False).ensure_built()
+    con = sqlite3.connect(str(path))
+    try:
+        for table in USER_TABLES:
+            count = con.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+            for copy in range(1, scale):
+                con.execute(f"""INSERT INTO {table} (имя, почта, пароль)
+                                SELECT имя, ? || '.' || почта, пароль FROM {table} WHERE id <= ?""",
+                            (copy, count))
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
@@ -0,0 +1,333 @@
+"""Набор замеров на синтетических данных с результатами в JSON
+
+Запуск из каталога src:
+    python -m benchmarks.suite --size 10k --output results.json
+    python -m benchmarks.suite --size 100k --scenarios login detail --latency 0.3
+    python -m benchmarks.suite --backend mysql --database test_exam_bench
+    python -m benchmarks.suite --backend sqlite mysql --output both.json
+    python -m benchmarks.suite --compare before.json after.json
+
+С несколькими --backend одни и те же сценарии выполняются на каждом
+хранилище по очереди; результаты лежат в results.<хранилище>.
+
+Отрисовка списка замеряется при наличии дисплея или Xvfb: xvfbwrapper
+ставится с зависимостями для разработки (pipenv install --dev), сам Xvfb —
+пакетом системы.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from benchmarks.datagen import SIZES
+from benchmarks.fixture import Fixture
+from utils.database.sqlite import SQLiteConnection, table_ddl
+from utils.metrics import row_size
+
+PAGE_SIZE = 30
+
+
+def summarize(samples):
+    """Статистика времени в миллисекундах"""
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def measure(func, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def scenario_login(fixture, args):
+    """auth_user: верный пароль, неверный пароль, неизвестная почта"""
+    db = fixture.db
+    credentials = fixture.credentials(args.samples)
+    accepted = sum(1 for email, password in credentials if db.auth_user(email, password))
+    return {
+        "accepted": accepted,
+        "success": measure(lambda c: db.auth_user(*c), credentials),
+        "wrong_password": measure(lambda c: db.auth_user(c[0], c[1] + "x"), credentials),
+        "unknown_email": measure(lambda c: db.auth_user("nobody." + c[0], c[1]), credentials),
+    }
+
+
+def scenario_list(fixture, args):
+    """Страницы и весь список (полные строки и сводка), отрисовка EventsWindow"""
+    db = fixture.db
+    result = {
+        "first_page": measure(lambda _: db.get_events_page(PAGE_SIZE), range(args.repeat)),
+        "first_page_summaries": measure(lambda _: db.get_event_summaries_page(PAGE_SIZE),
+                                        range(args.repeat)),
+    }
+
+    def walk(pages):
+        for number, _page in enumerate(pages, start=1):
+            if number >= args.pages:
+                break
+    result[f"walk_{args.pages}_pages"] = measure(
+        lambda _: walk(db.iter_events(page_size=PAGE_SIZE)), range(args.repeat))
+    result[f"walk_{args.pages}_pages_summaries"] = measure(
+        lambda _: walk(db.iter_event_summaries(page_size=PAGE_SIZE)), range(args.repeat))
+
+    for name, fetch in (("get_events", db.get_events), ("get_event_summaries", db.get_event_summaries)):
+        start = time.perf_counter()
+        events = fetch()
+        result[name] = {"rows": len(events), "ms": round((time.perf_counter() - start) * 1000, 3),
+                        "bytes": sum(row_size(event) for event in events)}
+    result["render"] = render_list(db, events, args)
+    return result
+
+
+@contextmanager
+def display():
+    """Дисплей для Tk: текущий или виртуальный Xvfb"""
+    if os.environ.get("DISPLAY"):
+        yield
+        return
+    from xvfbwrapper import Xvfb
+    vdisplay = Xvfb()
+    vdisplay.start()
+    try:
+        yield
+    finally:
+        vdisplay.stop()
+
+
+def render_list(db, events, args):
+    try:
+        with display():
+            return _render_list(db, events, args)
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+
+def _render_list(db, events, args):
+    import tkinter as tk
+
+    from main import EventsWindow, WindowManager
+    from utils.executor import TkExecutor
+
+    root = tk.Tk()
+    root.withdraw()
+    root.executor = TkExecutor(root)
+    root.windows = WindowManager()
+    try:
+        user = {"role": "participant", "data": {"id": 0, "имя": "Замер"}}
+        start = time.perf_counter()
+        window = EventsWindow(root, db, user)
+        deadline = start + 30
+        while not (window.loaded_count or window.all_loaded) and time.perf_counter() < deadline:
+            root.update()
+        first_page_ms = (time.perf_counter() - start) * 1000
+
+        def set_items(_):
+            window.events_list.set_items(events)
+            root.update_idletasks()
+
+        def scroll(step):
+            window.events_list.canvas.yview_moveto(step / 50)
+            root.update_idletasks()
+
+        return {
+            "first_page_ms": round(first_page_ms, 3),
+            "set_items": measure(set_items, range(args.repeat)),
+            "scroll_frame": measure(scroll, range(50)),
+        }
+    finally:
+        root.executor.shutdown()
+        root.destroy()
+
+
+def fetch_detail(db, event_id):
+    """То же, что EventDetailWindow.fetch_event"""
+    event = db.get_event_by_id(event_id)
+    if event:
+        organizer_id = db.event_field(event, 'organizer')
+        if organizer_id:
+            db.get_organizer_by_id(organizer_id)
+    return event
+
+
+def scenario_detail(fixture, args):
+    """Открытие мероприятия: без кэша и повторно из кэша"""
+    db = fixture.db
+    ids = fixture.event_ids(args.samples)
+
+    def cold(event_id):
+        db.cache.clear()
+        fetch_detail(db, event_id)
+
+    result = {"cold": measure(cold, ids)}
+    for event_id in ids:
+        fetch_detail(db, event_id)
+    result["warm"] = measure(lambda event_id: fetch_detail(db, event_id), ids)
+    return result
+
+
+def scenario_import(fixture, args):
+    """Загрузка CSV набора через utils.importer (без хеширования паролей)"""
+    from utils.importer import TABLES
+
+    if fixture.backend == "mysql":
+        return _import_mysql(fixture, TABLES)
+    with tempfile.TemporaryDirectory() as tmp:
+        con = SQLiteConnection(Path(tmp) / "import.sqlite3")
+        try:
+            return _import_sqlite(con, fixture.csv_dir, TABLES, args.batch_size)
+        finally:
+            con.close()
+
+
+def _import_sqlite(con, csv_dir, specs, batch_size):
+    from utils.importer import build_lookup, insert_batches, read_rows
+
+    cur = con.cursor()
+    for spec in specs:
+        cur.execute(table_ddl(spec))
+
+    tables = {}
+    total_start = time.perf_counter()
+    for spec in specs:
+        start = time.perf_counter()
+        lookups = {t: build_lookup(cur, t) for t in set(spec.references.values())}
+        rows = read_rows(spec, csv_dir, lookups, hash_passwords=False)
+        count = insert_batches(cur, spec, rows, batch_size)
+        con.commit()
+        elapsed = time.perf_counter() - start
+        tables[spec.table] = {"rows": count, "seconds": round(elapsed, 3),
+                              "rows_per_sec": round(count / elapsed) if elapsed else None}
+    elapsed = time.perf_counter() - total_start
+    total = sum(t["rows"] for t in tables.values())
+    return {"tables": tables, "rows": total, "seconds": round(elapsed, 3),
+            "rows_per_sec": round(total / elapsed) if elapsed else None}
+
+
+def _import_mysql(fixture, specs):
+    import mysql.connector
+
+    from utils.database import DB_CONFIG
+    from utils.importer import import_all
+
+    con = mysql.connector.connect(**{**DB_CONFIG, 'database': fixture.database})
+    try:
+        start = time.perf_counter()
+        reports = import_all(con, specs, truncate=True, csv_dir=fixture.csv_dir, hash_passwords=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        con.close()
+    total = sum(r["rows"] for r in reports)
+    return {"tables": {r["table"]: r for r in reports}, "rows": total, "seconds": round(elapsed, 3),
+            "rows_per_sec": round(total / elapsed) if elapsed else None}
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "list": scenario_list,
+    "detail": scenario_detail,
+    "import": scenario_import,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(data, prefix=""):
+    """Числовые показатели вида путь -> значение для сравнения прогонов"""
+    items = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            items.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and (key.endswith("_ms") or key.endswith("per_sec")
+                                                  or key == "ms"):
+            items[path] = value
+    return items
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as f:
+        before = flatten(json.load(f)["results"])
+    with open(after_path, encoding="utf-8") as f:
+        after = flatten(json.load(f)["results"])
+    print(f"{'показатель':55} {'было':>12} {'стало':>12} {'изменение':>10}")
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "—"
+        print(f"{path:55} {old:12.3f} {new:12.3f} {change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=list(SIZES), default="10k")
+    parser.add_argument("--backend", nargs="+", choices=["sqlite", "mysql"], default=["sqlite"])
+    parser.add_argument("--database", default="test_exam_bench", help="база MySQL для --backend mysql")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--samples", type=int, default=200, help="пользователей и мероприятий на сценарий")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20, help="страниц при прокрутке списка")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка сети на запрос (SQLite), мс")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = {
+        "meta": {
+            "size": args.size,
+            "backend": args.backend,
+            "seed": args.seed,
+            "latency_ms": args.latency,
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    report["meta"]["fixture_seconds"] = {}
+    for backend in args.backend:
+        results = report["results"][backend] = {}
+        with Fixture(args.size, backend, args.seed, args.latency / 1000, args.database) as fixture:
+            report["meta"]["fixture_seconds"][backend] = round(fixture.load_seconds, 3)
+            print(f"Набор {args.size} ({fixture.csv_dir}) в {backend} готов за {fixture.load_seconds:.1f} c")
+            for name in args.scenarios:
+                start = time.perf_counter()
+                results[name] = SCENARIOS[name](fixture, args)
+                print(f"{backend:6} {name:8} {time.perf_counter() - start:8.1f} c")
+                print(json.dumps(results[name], ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import shutil
+
+import pytest
+from mysql.connector import ProgrammingError
+
+from utils.database import Database, SQLiteBackend
+from utils.database.sqlite import build
+
+
+@pytest.fixture(scope="session")
+def sqlite_store(tmp_path_factory):
+    """База SQLite из import_csv, собранная один раз на прогон (пароли без хэширования)"""
+    path = tmp_path_factory.mktemp("store") / "store.sqlite3"
+    build(path, hash_passwords=False)
+    return path
+
+
+@pytest.fixture
+def sqlite_path(sqlite_store, tmp_path):
+    """Копия базы для одного теста: изменения не видны другим тестам"""
+    path = tmp_path / "store.sqlite3"
+    shutil.copyfile(sqlite_store, path)
+    return path
+
+
+@pytest.fixture
+def db(sqlite_path, tmp_path):
+    database = Database(backend=SQLiteBackend(sqlite_path, csv_dir=None),
+                        schema_cache_path=tmp_path / "schema_cache.json")
+    yield database
+    database.disconnect()
+
+
+class FakeCursor:
+    def __init__(self, con):
+        self.con = con
+
+    def execute(self, query, params=None):
+        self.con.queries.append(query)
+        if query.lstrip().upper().startswith("SELECT"):
+            # Как у mysql.connector с autocommit=False: первый запрос открывает транзакцию
+            self.con.in_transaction = True
+
+    def executemany(self, query, rows):
+        self.con.in_transaction = True
+        self.con.rows.extend(rows)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Соединение MySQL для загрузчика: запоминает запросы и вставленные строки"""
+
+    def __init__(self):
+        self.queries = []
+        self.rows = []
+        self.in_transaction = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        if self.in_transaction:
+            raise ProgrammingError(msg="Transaction already in progress")
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_connection():
+    return FakeConnection()
@@ -1,87 +1,208 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, font
-from PIL import Image, ImageTk
-import random
+from tkinter import ttk, messagebox, font, filedialog
 import time
+from collections import OrderedDict
 from datetime import datetime
-from utils.database import Database
+from pathlib import Path
+from utils.captcha_pool import PuzzlePool
+from utils.event_index import EventIndex, city_of, parse_date
+from utils.executor import TkExecutor
+from utils.rate_limit import LoginRateLimiter, client_key, email_key
+from utils.ui_profiler import StallProfiler, profiling_enabled
+
+CAPTCHA_DIR = Path(__file__).resolve().parent / "captcha_images"
+
+
+def connect_database():
+    """Импорт драйвера и подключение; выполняется в фоне при запуске
+
+    Хранилище задаётся переменной TEST_EXAM_DB_BACKEND: mysql (по умолчанию)
+    или sqlite — локальный файл из import_csv для работы без сервера.
+    Сервер MySQL — переменными TEST_EXAM_DB_HOST, TEST_EXAM_DB_USER,
+    TEST_EXAM_DB_PASSWORD и TEST_EXAM_DB_NAME.
+    """
+    from utils.database import Database
+    return Database()
+
+
+class WindowManager:
+    """Одно окно каждого вида: скрытое окно показывается снова, а не строится заново
+
+    Окно пересоздаётся, только если изменился его ключ (например, родитель)
+    или окно было уничтожено вместе с родителем.
+    """
+
+    def __init__(self):
+        # Вид окна -> (окно, ключ)
+        self.windows = {}
+
+    def show(self, kind, key, factory):
+        window, window_key = self.windows.get(kind, (None, None))
+        if window is not None and window.winfo_exists():
+            if window_key == key:
+                window.deiconify()
+                window.lift()
+                return window
+            window.destroy()
+
+        window = factory()
+        self.windows[kind] = (window, key)
+        return window
+
+    def close_all(self):
+        for window, _ in self.windows.values():
+            if window.winfo_exists():
+                window.destroy()
+        self.windows.clear()
 
 
 class PuzzleCaptcha(tk.Frame):
-    def __init__(self, parent, image_path, on_fail, on_success):
+    CANVAS_SIZE = 300
+    # Не чаще одного перемещения за кадр (~60 Гц)
+    FRAME_MS = 16
+
+    def __init__(self, parent, puzzles, executor, on_fail, on_success, puzzle=None):
         super().__init__(parent)
         self.parent = parent
         self.on_success = on_success
         self.on_fail = on_fail
-        self.image_path = image_path
-        self.original_image = Image.open(image_path)
+        # Источник готовых вариантов пазла (PuzzlePool)
+        self.puzzles = puzzles
+        # Генерация варианта в фоне, если готовых в пуле нет
+        self.executor = executor
+        self.loading = False
+        self.tileset = None
         self.parts = []
+        self.items = []
         self.correct_positions = []
-        self.drag_data = {"widget": None, "x": 0, "y": 0}
+        # Позиции фрагментов по индексу и индекс по id элемента canvas
+        self.positions = []
+        self.item_index = {}
+        self.drag_data = {"widget": None, "index": None, "x": 0, "y": 0}
+        # Накопленное смещение, ещё не применённое к canvas
+        self.pending_move = [0, 0]
+        self.move_after_id = None
         self.is_solved = False
-        self.create_widgets()
+        self.create_widgets(puzzle)
 
-    def create_widgets(self):
-        self.canvas = tk.Canvas(self, width=300, height=300, bg="white")
+    def create_widgets(self, puzzle=None):
+        self.canvas = tk.Canvas(self, width=self.CANVAS_SIZE, height=self.CANVAS_SIZE, bg="white")
         self.canvas.pack(pady=10)
+        # Обработчики привязаны к тегу один раз для всех фрагментов
+        self.canvas.tag_bind("tile", "<ButtonPress-1>", self.on_start_drag)
+        self.canvas.tag_bind("tile", "<B1-Motion>", self.on_drag)
+        self.canvas.tag_bind("tile", "<ButtonRelease-1>", self.on_drop)
+        if puzzle is not None:
+            self.load(puzzle)
+        else:
+            self.next_puzzle()
+
+    def load(self, puzzle):
+        """Показ варианта пазла; элементы canvas пересоздаются только при смене изображения"""
+        if puzzle.tileset is not self.tileset:
+            self.canvas.delete("all")
+            self.tileset = puzzle.tileset
+            self.parts = self.tileset.photos()
+            self.correct_positions = self.tileset.correct_positions
+            self.items = []
+            for tk_part in self.parts:
+                item = self.canvas.create_image(0, 0, image=tk_part, anchor='nw', tags=("tile",))
+                self.items.append(item)
+            self.item_index = {item: index for index, item in enumerate(self.items)}
+
+        self.drag_data["widget"] = self.drag_data["index"] = None
+        self.pending_move = [0, 0]
+        self.positions = list(puzzle.positions)
+        for item, (x, y) in zip(self.items, self.positions):
+            self.canvas.coords(item, x, y)
+        self.is_solved = False
+        self.loading = False
 
-        width, height = self.original_image.size
-        part_width, part_height = width // 2, height // 2
+    def next_puzzle(self):
+        """Следующий вариант: готовый из пула сразу, иначе заглушка до конца генерации"""
+        if self.loading:
+            return
+        puzzle = self.puzzles.try_pop()
+        if puzzle is not None:
+            self.load(puzzle)
+            return
+        self.show_loading()
+        self.executor.submit(self.puzzles.pop, on_success=self.load,
+                             on_error=self.on_load_error, owner=self)
 
-        coords = [
-            (0, 0, part_width, part_height),
-            (part_width, 0, width, part_height),
-            (0, part_height, part_width, height),
-            (part_width, part_height, width, height),
-        ]
+    def show_loading(self):
+        self.canvas.delete("all")
+        self.tileset = None
+        self.parts = []
+        self.items = []
+        self.item_index = {}
+        # Без варианта пазла проверка не проходит, пока его не загрузит load
+        self.positions = []
+        self.correct_positions = None
+        self.drag_data["widget"] = self.drag_data["index"] = None
+        self.canvas.create_text(self.CANVAS_SIZE // 2, self.CANVAS_SIZE // 2,
+                                text="Загрузка капчи...", font=('Arial', 12))
+        self.is_solved = False
+        self.loading = True
 
-        for i, box in enumerate(coords):
-            part = self.original_image.crop(box)
-            tk_part = ImageTk.PhotoImage(part)
-            self.parts.append(tk_part)
-            x = random.randint(0, 250)
-            y = random.randint(0, 250)
-            item = self.canvas.create_image(x, y, image=tk_part, anchor='nw')
-            self.canvas.tag_bind(item, "<ButtonPress-1>", self.on_start_drag)
-            self.canvas.tag_bind(item, "<B1-Motion>", self.on_drag)
-            self.canvas.tag_bind(item, "<ButtonRelease-1>", self.on_drop)
-            self.correct_positions.append((box[0], box[1]))
+    def on_load_error(self, error):
+        # Повторная попытка — кнопкой «Сбросить капчу»
+        self.loading = False
+        self.canvas.delete("all")
+        self.canvas.create_text(self.CANVAS_SIZE // 2, self.CANVAS_SIZE // 2,
+                                text="Не удалось загрузить капчу", font=('Arial', 12))
+        print(f"Ошибка генерации капчи: {error}")
 
     def on_start_drag(self, event):
-        item = self.canvas.find_closest(event.x, event.y)[0]
+        # Тег current — элемент под курсором, без перебора всех элементов
+        current = self.canvas.find_withtag("current")
+        item = current[0] if current else None
         self.drag_data["widget"] = item
+        self.drag_data["index"] = self.item_index.get(item)
         self.drag_data["x"] = event.x
         self.drag_data["y"] = event.y
 
     def on_drag(self, event):
-        dx = event.x - self.drag_data["x"]
-        dy = event.y - self.drag_data["y"]
-        self.canvas.move(self.drag_data["widget"], dx, dy)
+        if self.drag_data["index"] is None:
+            return
+        # Смещение копится и применяется не чаще раза за кадр
+        self.pending_move[0] += event.x - self.drag_data["x"]
+        self.pending_move[1] += event.y - self.drag_data["y"]
         self.drag_data["x"] = event.x
         self.drag_data["y"] = event.y
+        if self.move_after_id is None:
+            self.move_after_id = self.after(self.FRAME_MS, self.flush_move)
+
+    def flush_move(self):
+        """Применение накопленного смещения перетаскиваемого фрагмента"""
+        if self.move_after_id is not None:
+            self.after_cancel(self.move_after_id)
+            self.move_after_id = None
+
+        index = self.drag_data["index"]
+        dx, dy = self.pending_move
+        self.pending_move = [0, 0]
+        if index is None or not (dx or dy):
+            return
+        self.canvas.move(self.drag_data["widget"], dx, dy)
+        x, y = self.positions[index]
+        self.positions[index] = (x + dx, y + dy)
 
     def on_drop(self, event):
-        pass
-
-    def check_solution(self):
-        correct = True
-        items = list(self.canvas.find_all())
-
-        if len(items) != 4:
-            return False
-
-        for i, item in enumerate(items):
-            coords = self.canvas.coords(item)
-            if len(coords) < 2:
-                correct = False
-                break
+        """Привязка фрагмента к ближайшей ячейке сетки"""
+        index = self.drag_data["index"]
+        if index is None:
+            return
+        self.flush_move()
+        self.drag_data["widget"] = self.drag_data["index"] = None
 
-            x, y = coords[0], coords[1]
-            target_x, target_y = self.correct_positions[i]
-            if abs(x - target_x) > 20 or abs(y - target_y) > 20:
-                correct = False
-                break
+        snapped = self.tileset.snap(*self.positions[index], self.CANVAS_SIZE)
+        self.positions[index] = snapped
+        self.canvas.coords(self.items[index], *snapped)
 
+    def check_solution(self):
+        # Позиции после привязки к сетке целые: достаточно одного сравнения списков
+        correct = not self.loading and self.positions == self.correct_positions
         self.is_solved = correct
         return correct
 
@@ -94,44 +215,194 @@ class PuzzleCaptcha(tk.Frame):
             return False
 
     def reset_parts(self):
-        self.canvas.delete("all")
-        self.parts = []
-        self.original_image = Image.open(self.image_path)
+        self.next_puzzle()
 
-        width, height = self.original_image.size
-        part_width, part_height = width // 2, height // 2
 
-        coords = [
-            (0, 0, part_width, part_height),
-            (part_width, 0, width, part_height),
-            (0, part_height, part_width, height),
-            (part_width, part_height, width, height),
-        ]
+class EventCard:
+    """Переиспользуемая карточка мероприятия для виртуального списка"""
 
-        for i, box in enumerate(coords):
-            part = self.original_image.crop(box)
-            tk_part = ImageTk.PhotoImage(part)
-            self.parts.append(tk_part)
-            x = random.randint(0, 250)
-            y = random.randint(0, 250)
-            item = self.canvas.create_image(x, y, image=tk_part, anchor='nw')
-            self.canvas.tag_bind(item, "<ButtonPress-1>", self.on_start_drag)
-            self.canvas.tag_bind(item, "<B1-Motion>", self.on_drag)
-            self.canvas.tag_bind(item, "<ButtonRelease-1>", self.on_drop)
+    def __init__(self, parent, on_open):
+        self.on_open = on_open
+        self.event = None
+        self.index = None
 
-        self.is_solved = False
+        self.frame = tk.Frame(parent, bg="white",
+                              highlightbackground="#ddd", highlightthickness=1,
+                              cursor="hand2")  # Курсор рука для кликабельности
+        self.content_frame = tk.Frame(self.frame, bg="white")
+        self.content_frame.pack(fill="x", padx=15, pady=15)
+
+        # Название (кликабельное)
+        self.title_label = tk.Label(self.content_frame,
+                                    font=('Arial', 14, 'bold'),
+                                    anchor="w",
+                                    cursor="hand2",
+                                    fg="#2c3e50")  # Синий цвет для ссылки
+        self.title_label.grid(row=0, column=0, sticky="w", pady=(0, 5))
+
+        # Детали
+        self.details_frame = tk.Frame(self.content_frame)
+        self.details_frame.grid(row=1, column=0, sticky="w")
+
+        self.date_label = tk.Label(self.details_frame, font=('Arial', 11), fg="#555")
+        self.date_label.pack(anchor="w")
+
+        self.city_label = tk.Label(self.details_frame, font=('Arial', 11), fg="#555")
+        self.city_label.pack(anchor="w")
+
+        # Кнопка "Подробнее"
+        self.btn_frame = tk.Frame(self.content_frame)
+        self.btn_frame.grid(row=0, column=1, rowspan=2, padx=(20, 0))
+
+        tk.Button(self.btn_frame, text="Подробнее →",
+                  command=self.open,
+                  bg="#3498db", fg="white",
+                  font=('Arial', 10),
+                  padx=15, pady=5,
+                  cursor="hand2").pack()
+
+        # Обработчики привязываются один раз и читают текущее мероприятие карточки
+        for widget in (self.frame, self.title_label, self.date_label, self.city_label):
+            widget.bind("<Button-1>", lambda e: self.open())
+
+    def open(self):
+        if self.event is not None:
+            self.on_open(self.event)
+
+    def show(self, event, index):
+        """Привязка карточки к мероприятию из списка"""
+        self.event = event
+        self.index = index
+
+        bg_color = "#ffffff" if index % 2 == 0 else "#f8f9fa"
+        for widget in (self.frame, self.content_frame, self.title_label,
+                       self.details_frame, self.date_label, self.city_label, self.btn_frame):
+            widget.config(bg=bg_color)
+
+        self.title_label.config(text=event.get('Событие', 'Неизвестное мероприятие'))
+        self.date_label.config(text=f"📅 {event.get('DATE', 'Дата не указана')}")
+        self.city_label.config(text=f"🏙️ {city_of(event) or 'Город не указан'}")
+
+
+class VirtualEventList(tk.Frame):
+    """Список мероприятий, в котором существуют только видимые карточки"""
+
+    ROW_HEIGHT = 110
+    ROW_GAP = 10
+    # Число карточек сверх видимых сверху и снизу
+    OVERSCAN = 2
+
+    def __init__(self, parent, on_open, on_near_end=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_open = on_open
+        self.on_near_end = on_near_end
+        self.items = []
+        self.cards = []  # пары (карточка, id окна на canvas)
+
+        self.canvas = tk.Canvas(self, bg=self["bg"], highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind_all("<MouseWheel>", self.on_mousewheel)
+
+    def set_items(self, items, keep_position=False):
+        """Замена всего набора данных"""
+        self.items = list(items)
+        for card, _ in self.cards:
+            card.index = None
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self.update_scrollregion()
+        self.refresh()
+
+    def extend(self, items):
+        """Добавление следующей порции данных в конец списка"""
+        self.items.extend(items)
+        self.update_scrollregion()
+        self.refresh()
+
+    def update_scrollregion(self):
+        height = len(self.items) * self.ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+
+    def on_resize(self, event):
+        width = event.width - 10
+        needed = event.height // self.ROW_HEIGHT + 2 + 2 * self.OVERSCAN
+        while len(self.cards) < needed:
+            card = EventCard(self.canvas, self.on_open)
+            window = self.canvas.create_window(5, 0, window=card.frame, anchor="nw",
+                                               state="hidden")
+            self.cards.append((card, window))
+        for _, window in self.cards:
+            self.canvas.itemconfigure(window, width=width,
+                                      height=self.ROW_HEIGHT - self.ROW_GAP)
+        self.update_scrollregion()
+        self.refresh()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+
+    def refresh(self):
+        """Перепривязка пула карточек к видимому диапазону"""
+        if not self.cards:
+            return
+
+        top = int(self.canvas.canvasy(0)) // self.ROW_HEIGHT
+        first = max(0, top - self.OVERSCAN)
+
+        for slot, (card, window) in enumerate(self.cards):
+            index = first + slot
+            if index >= len(self.items):
+                self.canvas.itemconfigure(window, state="hidden")
+                card.index = None
+                continue
+            if card.index != index or card.event is not self.items[index]:
+                card.show(self.items[index], index)
+                self.canvas.coords(window, 5, index * self.ROW_HEIGHT)
+            self.canvas.itemconfigure(window, state="normal")
+
+        visible_end = first + len(self.cards) - self.OVERSCAN
+        if self.on_near_end and visible_end >= len(self.items):
+            self.on_near_end()
 
 
 class EventsWindow(tk.Toplevel):
+    PAGE_SIZE = 30
+    # Пауза после ввода, после которой применяется фильтр
+    FILTER_DELAY_MS = 250
+    SORT_OPTIONS = {
+        'По дате': 'date',
+        'По названию': 'title',
+        'По длительности': 'days',
+    }
+
     def __init__(self, parent, db, user_info):
         super().__init__(parent)
         self.parent = parent
         self.db = db
+        self.executor = parent.executor
+        self.windows = parent.windows
         self.user_info = user_info
+        self.pages = None
+        self.loaded_count = 0
+        self.all_loaded = False
+        self.page_pending = False
+        # Индекс загруженных мероприятий для поиска без запросов к базе
+        self.index = EventIndex()
+        self.filter_after_id = None
 
         self.title(f"Мероприятия - {self.get_role_text(user_info['role'])}")
         self.geometry("800x600")
         self.configure(bg="#f0f0f0")
+        self.protocol("WM_DELETE_WINDOW", self.logout)
 
         self.create_widgets()
         self.load_events()
@@ -180,139 +451,291 @@ class EventsWindow(tk.Toplevel):
         tk.Label(title_frame, text="Список мероприятий",
                  font=('Arial', 20, 'bold'), bg="#f0f0f0").pack()
 
-        # Контейнер для списка мероприятий
-        events_container = tk.Frame(self, bg="#f0f0f0")
-        events_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
-
-        # Canvas и Scrollbar
-        canvas = tk.Canvas(events_container, bg="#f0f0f0", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(events_container, orient="vertical", command=canvas.yview)
-        self.events_frame = tk.Frame(canvas, bg="#f0f0f0")
-
-        self.events_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=self.events_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.create_search_bar()
+
+        # Виртуальный список мероприятий
+        self.events_list = VirtualEventList(self, on_open=self.open_event_detail,
+                                            on_near_end=self.request_next_page,
+                                            bg="#f0f0f0")
+        self.events_list.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+
+        self.status_label = tk.Label(self.events_list.canvas, font=('Arial', 14),
+                                     bg="#f0f0f0", fg="#666")
+
+    def create_search_bar(self):
+        """Поиск по названию и фильтры по городу, датам и длительности"""
+        search_frame = tk.Frame(self, bg="#f0f0f0")
+        search_frame.pack(fill="x", padx=20, pady=(0, 10))
+
+        self.search_vars = {name: tk.StringVar()
+                            for name in ('text', 'city', 'date_from', 'date_to', 'days')}
+        self.sort_var = tk.StringVar(value=next(iter(self.SORT_OPTIONS)))
+
+        def add_label(text):
+            tk.Label(search_frame, text=text, bg="#f0f0f0",
+                     font=('Arial', 10)).pack(side="left", padx=(10, 3))
+
+        add_label("Поиск:")
+        ttk.Entry(search_frame, textvariable=self.search_vars['text'], width=20).pack(side="left")
+        add_label("Город:")
+        self.city_box = ttk.Combobox(search_frame, textvariable=self.search_vars['city'],
+                                     width=15, state="readonly",
+                                     postcommand=self.update_filter_values)
+        self.city_box.pack(side="left")
+        add_label("С:")
+        ttk.Entry(search_frame, textvariable=self.search_vars['date_from'], width=10).pack(side="left")
+        add_label("По:")
+        ttk.Entry(search_frame, textvariable=self.search_vars['date_to'], width=10).pack(side="left")
+        add_label("Дней:")
+        self.days_box = ttk.Combobox(search_frame, textvariable=self.search_vars['days'],
+                                     width=3, state="readonly",
+                                     postcommand=self.update_filter_values)
+        self.days_box.pack(side="left")
+        add_label("Сортировка:")
+        ttk.Combobox(search_frame, textvariable=self.sort_var, values=list(self.SORT_OPTIONS),
+                     width=15, state="readonly").pack(side="left")
+
+        for var in (*self.search_vars.values(), self.sort_var):
+            var.trace_add("write", lambda *args: self.schedule_filter())
+
+    def update_filter_values(self):
+        """Значения выпадающих списков из уже загруженных мероприятий"""
+        self.city_box["values"] = [""] + self.index.city_values()
+        self.days_box["values"] = [""] + [str(days) for days in self.index.days_values()]
+
+    def filters(self):
+        """Условия поиска; даты в нераспознанном формате не учитываются"""
+        values = {name: var.get().strip() for name, var in self.search_vars.items()}
+        return {
+            'text': values['text'],
+            'city': values['city'] or None,
+            'date_from': parse_date(values['date_from']),
+            'date_to': parse_date(values['date_to']),
+            'days': values['days'] or None,
+            'sort': self.SORT_OPTIONS.get(self.sort_var.get(), 'date'),
+        }
 
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    def filter_active(self):
+        filters = self.filters()
+        return filters.pop('sort') != 'date' or any(filters.values())
+
+    def schedule_filter(self):
+        """Фильтр применяется после паузы во вводе, а не на каждое нажатие"""
+        if self.filter_after_id is not None:
+            self.after_cancel(self.filter_after_id)
+        self.filter_after_id = self.after(self.FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self, keep_position=False):
+        self.filter_after_id = None
+        if not self.filter_active():
+            self.events_list.set_items(self.index.events, keep_position)
+            self.show_status(None if self.loaded_count or not self.all_loaded
+                             else "На данный момент нет доступных мероприятий")
+            return
 
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        events = self.index.search(**self.filters())
+        self.events_list.set_items(events, keep_position)
+        if events:
+            self.show_status()
+        else:
+            self.show_status("Ничего не найдено" if self.all_loaded else "Поиск...")
+        # Поиск должен охватить все мероприятия: догружаем оставшиеся страницы
+        self.request_next_page()
 
     def load_events(self):
-        events = self.db.get_events()
+        """Загрузка первой страницы мероприятий
+
+        Список читает только сводку (поля карточки и поиска); полная строка
+        мероприятия загружается в EventDetailWindow.
+        """
+        self.pages = self.db.iter_event_summaries(page_size=self.PAGE_SIZE)
+        self.loaded_count = 0
+        self.all_loaded = False
+        self.index.clear()
+        self.events_list.set_items([])
+        self.show_status("Загрузка мероприятий...")
+        self.load_next_page()
+
+    def show_status(self, text=None):
+        """Надпись поверх списка (загрузка, пустой список)"""
+        if text:
+            self.status_label.config(text=text)
+            self.status_label.place(relx=0.5, y=50, anchor="n")
+        else:
+            self.status_label.place_forget()
 
-        if not events:
-            no_events_label = tk.Label(self.events_frame,
-                                       text="На данный момент нет доступных мероприятий",
-                                       font=('Arial', 14), bg="#f0f0f0", fg="#666")
-            no_events_label.pack(pady=50)
+    def load_next_page(self):
+        """Подгрузка следующей страницы мероприятий в фоне"""
+        if self.all_loaded or self.pages is None:
+            self.page_pending = False
             return
 
-        for i, event in enumerate(events):
-            self.create_event_card(event, i)
+        self.page_pending = True
+        self.executor.submit(next, self.pages, None,
+                             on_success=self.on_page_loaded,
+                             on_error=self.on_page_error,
+                             owner=self)
 
-    def create_event_card(self, event, index):
-        """Создание кликабельной карточки мероприятия"""
-        card_frame = tk.Frame(self.events_frame, bg="white",
-                              highlightbackground="#ddd", highlightthickness=1,
-                              cursor="hand2")  # Курсор рука для кликабельности
-        card_frame.pack(fill="x", pady=(0, 10), padx=5)
-
-        # Связываем событие с карточкой
-        card_frame.bind("<Button-1>", lambda e, ev=event: self.open_event_detail(ev))
-
-        # Цвет фона
-        bg_color = "#ffffff" if index % 2 == 0 else "#f8f9fa"
-        card_frame.config(bg=bg_color)
-
-        # Содержимое карточки
-        content_frame = tk.Frame(card_frame, bg=bg_color)
-        content_frame.pack(fill="x", padx=15, pady=15)
-
-        # Название (кликабельное)
-        title_label = tk.Label(content_frame,
-                               text=event.get('Событие', 'Неизвестное мероприятие'),
-                               font=('Arial', 14, 'bold'),
-                               bg=bg_color,
-                               anchor="w",
-                               cursor="hand2",
-                               fg="#2c3e50")  # Синий цвет для ссылки
-        title_label.grid(row=0, column=0, sticky="w", pady=(0, 5))
-        title_label.bind("<Button-1>", lambda e, ev=event: self.open_event_detail(ev))
-
-        # Детали
-        details_frame = tk.Frame(content_frame, bg=bg_color)
-        details_frame.grid(row=1, column=0, sticky="w")
+    def on_page_loaded(self, events):
+        self.page_pending = False
+        if events is None:
+            self.all_loaded = True
+        else:
+            self.loaded_count += len(events)
+            self.index.add(events)
 
-        # Дата
-        date = event.get('DATE', 'Дата не указана')
-        date_label = tk.Label(details_frame, text=f"📅 {date}",
-                              font=('Arial', 11), bg=bg_color, fg="#555")
-        date_label.pack(anchor="w")
-        date_label.bind("<Button-1>", lambda e, ev=event: self.open_event_detail(ev))
+        if self.filter_active():
+            # Пока пользователь печатает, результат обновит отложенный фильтр
+            if self.filter_after_id is None:
+                self.apply_filter(keep_position=True)
+            return
+        if events:
+            self.events_list.extend(events)
 
-        # Город
-        city = event.get('Город', 'Город не указан')
-        city_label = tk.Label(details_frame, text=f"🏙️ {city}",
-                              font=('Arial', 11), bg=bg_color, fg="#555")
-        city_label.pack(anchor="w")
-        city_label.bind("<Button-1>", lambda e, ev=event: self.open_event_detail(ev))
+        if self.loaded_count:
+            self.show_status()
+        elif self.all_loaded:
+            self.show_status("На данный момент нет доступных мероприятий")
 
-        # Кнопка "Подробнее"
-        btn_frame = tk.Frame(content_frame, bg=bg_color)
-        btn_frame.grid(row=0, column=1, rowspan=2, padx=(20, 0))
+    def on_page_error(self, error):
+        self.page_pending = False
+        self.all_loaded = True
+        self.show_status(f"Ошибка загрузки мероприятий: {error}")
 
-        details_btn = tk.Button(btn_frame, text="Подробнее →",
-                                command=lambda ev=event: self.open_event_detail(ev),
-                                bg="#3498db", fg="white",
-                                font=('Arial', 10),
-                                padx=15, pady=5,
-                                cursor="hand2")
-        details_btn.pack()
+    def request_next_page(self):
+        """Список прокручен к концу: подгружаем страницу после простоя"""
+        if not (self.all_loaded or self.page_pending):
+            self.page_pending = True
+            self.after_idle(self.load_next_page)
 
     def open_event_detail(self, event):
         """Открытие окна с детальной информацией о мероприятии"""
         event_id = event.get('№')  # Используем номер из таблицы
         if event_id:
             self.withdraw()  # Скрываем текущее окно
-            EventDetailWindow(self, self.db, self.user_info, event_id)
+            # Окно деталей одно на список и только заполняется новыми данными
+            detail = self.windows.show('event_detail', str(self),
+                                       lambda: EventDetailWindow(self, self.db, self.user_info))
+            detail.show_event(event_id)
 
     def logout(self):
-        self.destroy()
+        # Окно скрывается: при повторном входе список не загружается заново
+        self.withdraw()
         self.parent.deiconify()
 
 
 class EventDetailWindow(tk.Toplevel):
-    def __init__(self, parent, db, user_info, event_id):
+    # Сколько отрисованных мероприятий хранить для повторного показа
+    CACHE_SIZE = 8
+
+    def __init__(self, parent, db, user_info):
         super().__init__(parent)
         self.parent = parent
         self.db = db
+        self.executor = parent.executor
         self.user_info = user_info
-        self.event_id = event_id
-
-        # Получаем информацию о мероприятии
-        self.event = self.db.get_event_by_id(event_id)
-        if not self.event:
-            messagebox.showerror("Ошибка", "Мероприятие не найдено!")
-            self.destroy()
-            return
-
-        self.title(f"Мероприятие: {self.event.get('Событие', 'Неизвестно')}")
+        self.event_id = None
+        self.event = None
+        self.organizer = None
+        # event_id -> (frame, event, organizer), от давно открытых к недавним
+        self.rendered = OrderedDict()
+        self.current_frame = None
+
+        self.title("Мероприятие: загрузка...")
         self.geometry("900x600")
         self.configure(bg="#f5f5f5")
+        self.protocol("WM_DELETE_WINDOW", self.go_back)
 
-        self.create_widgets()
+        self.create_header()
+        self.loading_label = tk.Label(self, text="Загрузка мероприятия...",
+                                      font=('Arial', 14), bg="#f5f5f5", fg="#666")
 
         # Центрируем окно
         self.center_window()
 
+    def show_event(self, event_id):
+        """Показ мероприятия: из уже отрисованных или с загрузкой в фоне"""
+        self.event_id = event_id
+        rendered = self.rendered.get(event_id)
+        if rendered is not None:
+            self.rendered.move_to_end(event_id)
+            self.display(*rendered)
+            return
+
+        self.hide_current()
+        self.title("Мероприятие: загрузка...")
+        self.name_label.config(text="")
+        self.loading_label.pack(expand=True)
+
+        # Получаем информацию о мероприятии в фоне
+        self.executor.submit(self.fetch_event, event_id,
+                             on_success=lambda result: self.on_event_loaded(event_id, result),
+                             on_error=self.on_event_error,
+                             owner=self)
+
+    def fetch_event(self, event_id):
+        """Загрузка мероприятия и организатора (выполняется в рабочем потоке)"""
+        event = self.db.get_event_by_id(event_id)
+        organizer = None
+        if event:
+            organizer_id = self.db.event_field(event, 'organizer')
+            if organizer_id:
+                organizer = self.db.get_organizer_by_id(organizer_id)
+        return event, organizer
+
+    def on_event_loaded(self, event_id, result):
+        if event_id != self.event_id:
+            # Пока шла загрузка, открыли другое мероприятие
+            return
+
+        event, organizer = result
+        if not event:
+            messagebox.showerror("Ошибка", "Мероприятие не найдено!")
+            self.go_back()
+            return
+
+        self.loading_label.pack_forget()
+        self.event, self.organizer = event, organizer
+        frame = self.create_widgets()
+        self.rendered[event_id] = (frame, event, organizer)
+        while len(self.rendered) > self.CACHE_SIZE:
+            _, (old_frame, _, _) = self.rendered.popitem(last=False)
+            old_frame.destroy()
+        self.display(frame, event, organizer)
+
+    def on_event_error(self, error):
+        messagebox.showerror("Ошибка", f"Не удалось загрузить мероприятие: {error}")
+        self.go_back()
+
+    def display(self, frame, event, organizer):
+        """Показ отрисованного мероприятия вместо текущего"""
+        self.event, self.organizer = event, organizer
+        event_name = event.get('Событие', 'Неизвестное мероприятие')
+        self.title(f"Мероприятие: {event.get('Событие', 'Неизвестно')}")
+        self.name_label.config(text=event_name)
+        self.loading_label.pack_forget()
+        if frame is not self.current_frame:
+            self.hide_current()
+            frame.pack(fill="both", expand=True, padx=20, pady=20)
+            self.current_frame = frame
+
+    def hide_current(self):
+        """Скрытие текущего мероприятия; удалённое из кэша уничтожается"""
+        frame = self.current_frame
+        if frame is None:
+            return
+        if any(frame is cached for cached, _, _ in self.rendered.values()):
+            frame.pack_forget()
+        else:
+            frame.destroy()
+        self.current_frame = None
+
+    def forget_event(self, event_id):
+        """Отрисованная копия устарела: при следующем показе мероприятие загрузится заново"""
+        rendered = self.rendered.pop(event_id, None)
+        if rendered is not None and rendered[0] is not self.current_frame:
+            rendered[0].destroy()
+
     def center_window(self):
         """Центрирование окна на экране"""
         self.update_idletasks()
@@ -322,18 +745,17 @@ class EventDetailWindow(tk.Toplevel):
         y = (self.winfo_screenheight() // 2) - (height // 2)
         self.geometry(f'{width}x{height}+{x}+{y}')
 
-    def create_widgets(self):
-        # Верхняя панель с названием
+    def create_header(self):
+        # Верхняя панель с названием; общая для всех мероприятий
         top_frame = tk.Frame(self, bg="#2c3e50", height=80)
         top_frame.pack(fill="x")
         top_frame.pack_propagate(False)
 
         # Название мероприятия
-        event_name = self.event.get('Событие', 'Неизвестное мероприятие')
-        name_label = tk.Label(top_frame, text=event_name,
-                              font=('Arial', 18, 'bold'),
-                              bg="#2c3e50", fg="white")
-        name_label.pack(side="left", padx=20, pady=20)
+        self.name_label = tk.Label(top_frame, text="",
+                                   font=('Arial', 18, 'bold'),
+                                   bg="#2c3e50", fg="white")
+        self.name_label.pack(side="left", padx=20, pady=20)
 
         # Кнопка назад
         back_btn = tk.Button(top_frame, text="← Назад",
@@ -343,9 +765,9 @@ class EventDetailWindow(tk.Toplevel):
                              padx=15, pady=5)
         back_btn.pack(side="right", padx=20)
 
-        # Основной контент
+    def create_widgets(self):
+        """Содержимое окна для текущего мероприятия; размещается в display()"""
         content_frame = tk.Frame(self, bg="#f5f5f5")
-        content_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
         # Левая панель (1/3 ширины) - основная информация
         left_frame = tk.Frame(content_frame, bg="white",
@@ -406,6 +828,7 @@ class EventDetailWindow(tk.Toplevel):
 
         # Кнопки действий (в зависимости от роли)
         self.create_action_buttons(right_frame)
+        return content_frame
 
     def display_event_info(self, parent):
         """Отображение основной информации о мероприятии"""
@@ -428,21 +851,19 @@ class EventDetailWindow(tk.Toplevel):
         info_items.append(("⏱️ Длительность:", duration_text))
 
         # Организатор (если есть связь с таблицей организаторов)
-        organizer_id = self.event.get('организатор_id') or self.event.get('id_организатора')
-        if organizer_id:
-            organizer = self.db.get_organizer_by_id(organizer_id)
-            org_name = organizer.get('имя', 'Неизвестный организатор')
+        if self.organizer:
+            org_name = self.organizer.get('имя', 'Неизвестный организатор')
             info_items.append(("👤 Организатор:", org_name))
         else:
             info_items.append(("👤 Организатор:", "Не указан"))
 
         # Место проведения (если есть поле)
-        location = self.event.get('Место') or self.event.get('Локация') or self.event.get('Адрес')
+        location = self.db.event_field(self.event, 'location')
         if location:
             info_items.append(("📍 Место проведения:", location))
 
         # Время (если есть поле)
-        time_info = self.event.get('Время') or self.event.get('Время_начала')
+        time_info = self.db.event_field(self.event, 'time')
         if time_info:
             info_items.append(("🕐 Время начала:", time_info))
 
@@ -472,8 +893,8 @@ class EventDetailWindow(tk.Toplevel):
                 return self.event[field]
 
         # Если описания нет, создаем текст с местом и временем
-        location = self.event.get('Место') or self.event.get('Локация') or self.event.get('Адрес') or 'Место не указано'
-        time_info = self.event.get('Время') or self.event.get('Время_начала') or 'Время не указано'
+        location = self.db.event_field(self.event, 'location') or 'Место не указано'
+        time_info = self.db.event_field(self.event, 'time') or 'Время не указано'
         date = self.event.get('DATE', 'Дата не указана')
 
         description = f"""Мероприятие "{self.event.get('Событие', 'Неизвестное мероприятие')}"
@@ -543,16 +964,20 @@ class EventDetailWindow(tk.Toplevel):
                       command=self.share_event).pack(side="left", padx=5)
 
     def go_back(self):
-        """Возврат к списку мероприятий"""
-        self.destroy()
+        """Возврат к списку мероприятий; окно скрывается до следующего открытия"""
+        self.withdraw()
         self.parent.deiconify()  # Показываем родительское окно
 
     # Методы-заглушки для кнопок
     def edit_event(self):
+        self.db.invalidate_event(self.event_id)
+        self.forget_event(self.event_id)
         messagebox.showinfo("Редактирование", "Функция редактирования в разработке")
 
     def delete_event(self):
         if messagebox.askyesno("Удаление", "Вы уверены, что хотите удалить мероприятие?"):
+            self.db.invalidate_event(self.event_id)
+            self.forget_event(self.event_id)
             messagebox.showinfo("Удаление", "Мероприятие удалено (заглушка)")
             self.go_back()
 
@@ -570,18 +995,120 @@ class EventDetailWindow(tk.Toplevel):
         messagebox.showinfo("Поделиться", "Ссылка скопирована в буфер обмена")
 
 
+class DebugPanel(tk.Toplevel):
+    """Статистика запросов к базе: открывается в окне организатора по Ctrl+Shift+D"""
+    REFRESH_MS = 1000
+    COLUMNS = (
+        ('count', 'Вызовов', 70),
+        ('avg_ms', 'Сред., мс', 80),
+        ('p95_ms', 'p95, мс', 80),
+        ('max_ms', 'Макс., мс', 80),
+        ('rows', 'Строк', 70),
+        ('bytes', 'Байт', 90),
+        ('errors', 'Ошибок', 70),
+    )
+
+    def __init__(self, parent, db):
+        super().__init__(parent)
+        self.db = db
+        self.refresh_after_id = None
+
+        self.title("Отладка: запросы к базе данных")
+        self.geometry("1100x600")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        toolbar = tk.Frame(self)
+        toolbar.pack(fill="x", padx=10, pady=10)
+        ttk.Button(toolbar, text="Обновить", command=self.refresh).pack(side="left")
+        ttk.Button(toolbar, text="Сбросить", command=self.reset).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Экспорт JSON",
+                   command=lambda: self.export("json")).pack(side="left", padx=5)
+        ttk.Button(toolbar, text="Экспорт Prometheus",
+                   command=lambda: self.export("prometheus")).pack(side="left")
+
+        self.summary_label = tk.Label(self, anchor="w", justify="left", font=('Consolas', 9))
+        self.summary_label.pack(fill="x", padx=10)
+
+        self.tree = ttk.Treeview(self, columns=[name for name, _, _ in self.COLUMNS], height=12)
+        self.tree.heading("#0", text="Запрос")
+        self.tree.column("#0", width=450)
+        for name, title, width in self.COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        tk.Label(self, text="Медленные запросы и ошибки:", anchor="w").pack(fill="x", padx=10)
+        self.slow_text = tk.Text(self, height=8, font=('Consolas', 9), state="disabled")
+        self.slow_text.pack(fill="x", padx=10, pady=(0, 10))
+
+    def refresh(self):
+        if self.refresh_after_id is not None:
+            self.after_cancel(self.refresh_after_id)
+        snapshot = self.db.query_stats()
+
+        self.summary_label.config(
+            text=f"Пул: {self.db.pool_stats()}\nКэш: {self.db.cache_stats()}\n"
+                 f"Порог медленного запроса: {snapshot['slow_threshold_ms']:.0f} мс")
+
+        self.tree.delete(*self.tree.get_children())
+        statements = sorted(snapshot["statements"].items(), key=lambda item: -item[1]["total_seconds"])
+        for statement, stats in statements:
+            self.tree.insert("", "end", text=statement,
+                             values=[stats[name] for name, _, _ in self.COLUMNS])
+
+        self.slow_text.config(state="normal")
+        self.slow_text.delete("1.0", "end")
+        for entry in reversed(snapshot["slow_log"]):
+            moment = datetime.fromtimestamp(entry["time"]).strftime("%H:%M:%S")
+            problem = f"ошибка: {entry['error']}" if entry["error"] else f"{entry['ms']} мс"
+            self.slow_text.insert("end", f"{moment}  {problem}  {entry['statement']}\n")
+        self.slow_text.config(state="disabled")
+
+        self.refresh_after_id = self.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        self.db.metrics.reset()
+        self.refresh()
+
+    def export(self, fmt):
+        extension = ".prom" if fmt == "prometheus" else ".json"
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=extension,
+                                            initialfile=f"query_stats{extension}")
+        if path:
+            try:
+                self.db.metrics.dump(path, fmt)
+            except OSError as e:
+                messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {e}", parent=self)
+
+    def close(self):
+        if self.refresh_after_id is not None:
+            self.after_cancel(self.refresh_after_id)
+            self.refresh_after_id = None
+        self.destroy()
+
+
 class OrganizerWindow(tk.Toplevel):
     def __init__(self, parent, db, user_info):
         super().__init__(parent)
         self.parent = parent
         self.db = db
+        self.executor = parent.executor
+        self.windows = parent.windows
         self.user_info = user_info
+        self.debug_panel = None
 
         # Настройка окна
         self.title("Окно организатора")
         self.geometry("1000x700")
         self.configure(bg="#f5f5f5")
         self.minsize(900, 600)
+        self.protocol("WM_DELETE_WINDOW", self.logout)
+        # Скрытая панель статистики запросов
+        self.bind("<Control-Shift-D>", self.toggle_debug_panel)
 
         # Создаем интерфейс
         self.create_widgets()
@@ -750,6 +1277,14 @@ class OrganizerWindow(tk.Toplevel):
                             relief="raised")
             btn.pack()
 
+    def toggle_debug_panel(self, event=None):
+        """Показ или закрытие панели статистики запросов"""
+        if self.debug_panel is not None and self.debug_panel.winfo_exists():
+            self.debug_panel.close()
+            self.debug_panel = None
+        else:
+            self.debug_panel = DebugPanel(self, self.db)
+
     def open_profile(self):
         """Открытие профиля"""
         messagebox.showinfo("Профиль", "Редактирование профиля")
@@ -757,7 +1292,7 @@ class OrganizerWindow(tk.Toplevel):
     def open_events(self):
         """Открытие мероприятий"""
         self.withdraw()  # Скрываем окно организатора
-        EventsWindow(self, self.db, self.user_info)
+        self.windows.show('events', str(self), lambda: EventsWindow(self, self.db, self.user_info))
 
     def open_participants(self):
         """Открытие участников"""
@@ -769,31 +1304,59 @@ class OrganizerWindow(tk.Toplevel):
 
     def logout(self):
         """Выход из системы"""
-        self.destroy()
+        self.withdraw()
         self.parent.deiconify()  # Показываем окно авторизации
 
 
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
+        # С TEST_EXAM_UI_PROFILE=1 — время всех обработчиков Tk; зависания
+        # дольше 50 мс попадают в отчёт сессии (.ui_profile)
+        self.profiler = StallProfiler(threshold=0.05).install() if profiling_enabled() else None
         self.geometry("600x850")
         self.resizable(False, False)
         self.configure(bg="#191919")
-        self.locked_until = None
-        self.failed_attempts = 0
+        # Ограничение попыток хранится на диске и общее для всех запусков
         self.max_attempts = 3
         self.lock_duration = 10 * 60
+        self.rate_limiter = LoginRateLimiter(max_attempts=self.max_attempts,
+                                             lock_duration=self.lock_duration)
+        self.client_key = client_key()
+        self.locked_until = None
+        self.unlock_after_id = None
         self.captcha_frame = None
         self.login_button = None
         self.captcha = None
         self.captcha_button = None
         self.current_user = None
+        # Размер сетки пазла (столбцы, строки)
+        self.captcha_grid = (2, 2)
+        self.puzzle_pool = PuzzlePool(CAPTCHA_DIR, *self.captcha_grid,
+                                      canvas_size=PuzzleCaptcha.CANVAS_SIZE).start()
 
-        # База данных
-        self.db = Database()
+        # Фоновые запросы; соединение с базой открывается, пока вводятся данные
+        self.executor = TkExecutor(self)
+        self.db_future = self.executor.submit(connect_database)
+        # Окна после входа; при повторном входе того же пользователя показываются снова
+        self.windows = WindowManager()
 
         self.show_login()
 
+        # Блокировка могла остаться от прошлого запуска
+        locked_until = self.rate_limiter.locked_until(self.client_key)
+        if locked_until:
+            self.lock_login(locked_until, notify=False)
+
+    @property
+    def db(self):
+        """База данных; ожидает подключения, если оно ещё не завершено"""
+        return self.db_future.result()
+
+    def authenticate(self, email, password):
+        """Авторизация в фоновом потоке, после открытия соединения"""
+        return self.db.auth_user(email, password)
+
     def show_login(self):
         """Показ окна авторизации"""
         self.title('Авторизация')
@@ -852,26 +1415,43 @@ class App(tk.Tk):
         self.login_button.pack(pady=20)
 
         # Счетчик попыток
-        self.attempts_label = tk.Label(self, text=f"Попыток: {self.failed_attempts}/{self.max_attempts}",
-                                       font=('Arial', 10), bg="#191919", fg="white")
+        self.attempts_label = tk.Label(self, font=('Arial', 10), bg="#191919", fg="white")
         self.attempts_label.pack()
+        self.update_attempts_label()
 
         # Загружаем капчу
         self.start_captcha()
 
     def start_captcha(self):
-        """Загрузка капчи"""
+        """Загрузка капчи; первый вариант готовится в фоне, окно не ждёт PIL"""
+        for widget in self.captcha_frame.winfo_children():
+            widget.destroy()
+
+        self.captcha = None
+        tk.Label(self.captcha_frame, text="Загрузка капчи...", font=('Arial', 12),
+                 bg="#191919", fg="white", width=30, height=15).pack()
+        self.executor.submit(self.puzzle_pool.pop,
+                             on_success=self.show_captcha,
+                             owner=self.captcha_frame)
+
+    def show_captcha(self, puzzle):
+        """Показ капчи с готовым вариантом пазла"""
         for widget in self.captcha_frame.winfo_children():
             widget.destroy()
 
         self.captcha = PuzzleCaptcha(self.captcha_frame,
-                                     r"C:\Users\Nik\Desktop\de_test\src\i.png",
+                                     self.puzzle_pool,
+                                     self.executor,
                                      self.captcha_failed,
-                                     self.captcha_success)
+                                     self.captcha_success,
+                                     puzzle=puzzle)
         self.captcha.pack()
+        self.check_fields()
 
     def check_captcha(self):
         """Проверка капчи"""
+        if not self.captcha:
+            return
         if self.captcha.verify_captcha():
             self.check_fields()
         else:
@@ -888,16 +1468,30 @@ class App(tk.Tk):
         messagebox.showinfo("Успех", "Капча пройдена!")
         self.check_fields()
 
+    def limit_keys(self):
+        """Ключи ограничителя: клиент и введённая почта"""
+        email = self.login_entry.get().strip()
+        return (self.client_key, email_key(email)) if email else (self.client_key,)
+
+    def update_attempts_label(self):
+        used = self.max_attempts - self.rate_limiter.attempts_left(self.client_key)
+        self.attempts_label.config(text=f"Попыток: {used}/{self.max_attempts}")
+
+    def register_failure(self):
+        """Учёт неудачной попытки; возвращает число оставшихся попыток"""
+        remaining, locked_until = self.rate_limiter.register_failure(*self.limit_keys())
+        self.update_attempts_label()
+        if locked_until:
+            self.lock_login(locked_until)
+        return remaining
+
     def captcha_failed(self):
         """Неудачная проверка капчи"""
-        self.failed_attempts += 1
-        self.attempts_label.config(text=f"Попыток: {self.failed_attempts}/{self.max_attempts}")
+        remaining = self.register_failure()
 
-        if self.failed_attempts >= self.max_attempts:
-            self.lock_login()
-        else:
+        if not self.locked_until:
             messagebox.showerror("Ошибка",
-                                 f"Капча не пройдена! Осталось попыток: {self.max_attempts - self.failed_attempts}")
+                                 f"Капча не пройдена! Осталось попыток: {remaining}")
             self.captcha.reset_parts()
 
     def check_fields(self, event=None):
@@ -922,10 +1516,27 @@ class App(tk.Tk):
         email = self.login_entry.get().strip()
         password = self.password_entry.get().strip()
 
-        # Проверка в базе данных
-        user_data = self.db.auth_user(email, password)
+        locked_until = self.rate_limiter.locked_until(*self.limit_keys())
+        if locked_until:
+            self.lock_login(locked_until)
+            return
+
+        # Проверка в базе данных выполняется в фоне
+        self.login_button.config(state="disabled", text="Проверка...")
+        self.executor.submit(self.authenticate, email, password,
+                             on_success=lambda user_data: self.on_login_result(user_data, email),
+                             on_error=self.on_login_error,
+                             owner=self.login_button)
+
+    def on_login_result(self, user_data, email):
+        """Результат авторизации"""
+        self.login_button.config(text="Войти")
 
         if user_data:
+            self.rate_limiter.reset(self.client_key, email_key(email))
+            if self.user_key(user_data) != self.user_key(self.current_user):
+                # Окна прежнего пользователя не переиспользуются
+                self.windows.close_all()
             self.current_user = user_data
             self.withdraw()  # Скрываем окно авторизации
 
@@ -937,12 +1548,25 @@ class App(tk.Tk):
             elif user_data['role'] == 'participant':
                 self.show_events_window(user_data)
         else:
-            messagebox.showerror("Ошибка", "Неверная почта или пароль!")
+            self.register_failure()
+            if not self.locked_until:
+                messagebox.showerror("Ошибка", "Неверная почта или пароль!")
             self.reset_captcha()
 
+    def on_login_error(self, error):
+        """Ошибка обращения к базе данных при авторизации"""
+        self.login_button.config(text="Войти")
+        messagebox.showerror("Ошибка", f"Нет связи с базой данных: {error}")
+        self.check_fields()
+
+    def user_key(self, user_data):
+        if not user_data:
+            return None
+        return user_data['role'], user_data['data'].get('id')
+
     def show_organizer_window(self, user_data):
         """Показ окна организатора"""
-        OrganizerWindow(self, self.db, user_data)
+        self.windows.show('organizer', str(self), lambda: OrganizerWindow(self, self.db, user_data))
 
     def show_moderator_window(self, user_data):
         """Показ окна модератора"""
@@ -952,24 +1576,42 @@ class App(tk.Tk):
 
     def show_events_window(self, user_data):
         """Показ окна с мероприятиями (для участников)"""
-        EventsWindow(self, self.db, user_data)
-
-    def lock_login(self):
-        """Блокировка входа"""
-        self.locked_until = time.time() + self.lock_duration
-        messagebox.showwarning("Блокировка", "Вход заблокирован на 10 минут!")
-        self.update_lock_timer()
-
-    def update_lock_timer(self):
-        """Обновление таймера блокировки"""
-        if self.locked_until is not None:
-            remaining = int(self.locked_until - time.time())
-            if remaining > 0:
-                self.after(1000, self.update_lock_timer)
-            else:
-                self.locked_until = None
-                self.failed_attempts = 0
-                self.check_fields()
+        self.windows.show('events', str(self), lambda: EventsWindow(self, self.db, user_data))
+
+    def lock_login(self, locked_until, notify=True):
+        """Блокировка входа до locked_until; разблокировка — одним отложенным вызовом"""
+        self.locked_until = locked_until
+        if self.unlock_after_id is not None:
+            self.after_cancel(self.unlock_after_id)
+        delay_ms = max(0, int((locked_until - time.time()) * 1000))
+        self.unlock_after_id = self.after(delay_ms, self.unlock_login)
+
+        until_text = datetime.fromtimestamp(locked_until).strftime("%H:%M")
+        self.attempts_label.config(text=f"Вход заблокирован до {until_text}")
+        self.check_fields()
+        if notify:
+            messagebox.showwarning("Блокировка", f"Вход заблокирован до {until_text}!")
+
+    def unlock_login(self):
+        """Снятие блокировки входа"""
+        self.unlock_after_id = None
+        self.locked_until = None
+        self.update_attempts_label()
+        self.check_fields()
+
+    def destroy(self):
+        self.puzzle_pool.stop()
+        self.executor.shutdown()
+        super().destroy()
+        if self.profiler is None:
+            return
+        self.profiler.uninstall()
+        if self.profiler.handlers:
+            print(self.profiler.summary())
+            try:
+                print(f"Отчёт профилировщика: {self.profiler.save_report()}")
+            except OSError as e:
+                print(f"Не удалось сохранить отчёт профилировщика: {e}")
 
 
 if __name__ == '__main__':
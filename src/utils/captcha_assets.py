@@ -0,0 +1,66 @@
+import threading
+
+from PIL import Image, ImageTk
+
+
+class TileSet:
+    """Изображение капчи, разрезанное на сетку фрагментов"""
+
+    def __init__(self, path, cols=2, rows=2, max_size=None):
+        self.path = str(path)
+        self.cols = cols
+        self.rows = rows
+
+        with Image.open(self.path) as image:
+            image.load()
+            if max_size:
+                # Уменьшаем, чтобы собранный пазл помещался на canvas
+                image.thumbnail((max_size, max_size))
+            width, height = image.size
+            self.tile_width, self.tile_height = width // cols, height // rows
+            # Фрагменты по строкам: (left, top, right, bottom)
+            self.boxes = [
+                (col * self.tile_width, row * self.tile_height,
+                 (col + 1) * self.tile_width, (row + 1) * self.tile_height)
+                for row in range(rows) for col in range(cols)
+            ]
+            self.tiles = [image.crop(box) for box in self.boxes]
+
+        self._photos = None
+
+    @property
+    def correct_positions(self):
+        return [(box[0], box[1]) for box in self.boxes]
+
+    def snap(self, x, y, canvas_size):
+        """Ближайшая ячейка сетки фрагментов для позиции (x, y)
+
+        Сетка покрывает весь canvas, чтобы фрагменты можно было отложить в сторону.
+        """
+        width, height = self.tile_width, self.tile_height
+        max_x = (canvas_size // width - 1) * width
+        max_y = (canvas_size // height - 1) * height
+        return (min(max(round(x / width) * width, 0), max_x),
+                min(max(round(y / height) * height, 0), max_y))
+
+    def photos(self):
+        """PhotoImage фрагментов; создаются один раз, только в потоке Tk"""
+        if self._photos is None:
+            self._photos = [ImageTk.PhotoImage(tile) for tile in self.tiles]
+        return self._photos
+
+
+_tilesets = {}
+_lock = threading.Lock()
+
+
+def get_tileset(path, cols=2, rows=2, max_size=None):
+    """Разрезанное изображение из кэша; файл читается один раз"""
+    key = (str(path), cols, rows, max_size)
+    with _lock:
+        tileset = _tilesets.get(key)
+    if tileset is None:
+        tileset = TileSet(path, cols, rows, max_size)
+        with _lock:
+            tileset = _tilesets.setdefault(key, tileset)
+    return tileset
@@ -0,0 +1,94 @@
+import random
+import threading
+from collections import deque
+from pathlib import Path
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp'}
+
+
+class Puzzle:
+    """Готовый вариант пазла: фрагменты и их начальные позиции"""
+
+    def __init__(self, tileset, positions):
+        self.tileset = tileset
+        self.positions = positions
+
+
+class PuzzlePool:
+    """Кольцевой буфер пазлов, заполняемый фоновым потоком
+
+    Декодирование и нарезка изображений выполняются в фоне; поток Tk
+    только забирает готовый вариант через pop().
+    """
+
+    def __init__(self, image_dir, cols=2, rows=2, capacity=8, canvas_size=300):
+        self.image_dir = Path(image_dir)
+        self.cols = cols
+        self.rows = rows
+        self.capacity = capacity
+        self.canvas_size = canvas_size
+        self.paths = sorted(p for p in self.image_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        if not self.paths:
+            raise FileNotFoundError(f"Нет изображений для капчи в {self.image_dir}")
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        """Запуск фоновой генерации"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._fill, name="captcha-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        """Число готовых вариантов в буфере"""
+        with self._cond:
+            return len(self._buffer)
+
+    def try_pop(self):
+        """Готовый пазл или None, если буфер пуст; не блокирует поток Tk"""
+        with self._cond:
+            if self._buffer:
+                puzzle = self._buffer.popleft()
+                self._cond.notify()
+                return puzzle
+        return None
+
+    def pop(self):
+        """Готовый пазл; если буфер пуст, вариант создаётся сразу
+
+        Генерация занимает десятки миллисекунд: из потока Tk вызывать
+        try_pop, а pop — через TkExecutor.
+        """
+        puzzle = self.try_pop()
+        return puzzle if puzzle is not None else self.generate()
+
+    def generate(self):
+        """Новый вариант: случайное изображение и случайная раскладка"""
+        # PIL импортируется при первой генерации, в фоновом потоке
+        from utils.captcha_assets import get_tileset
+
+        tileset = get_tileset(random.choice(self.paths), self.cols, self.rows, self.canvas_size)
+        max_x = max(0, self.canvas_size - tileset.tile_width)
+        max_y = max(0, self.canvas_size - tileset.tile_height)
+        positions = [(random.randint(0, max_x), random.randint(0, max_y)) for _ in tileset.tiles]
+        return Puzzle(tileset, positions)
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._stopped and len(self._buffer) >= self.capacity:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+            puzzle = self.generate()
+            with self._cond:
+                self._buffer.append(puzzle)
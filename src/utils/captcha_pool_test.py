@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from utils.captcha_assets import get_tileset
+from utils.captcha_pool import PuzzlePool
+
+CAPTCHA_DIR = Path(__file__).resolve().parents[1] / "captcha_images"
+CANVAS_SIZE = 300
+
+
+@pytest.fixture
+def tileset():
+    return get_tileset(next(CAPTCHA_DIR.glob("*.png")), 2, 2, CANVAS_SIZE)
+
+
+def test_tiles_fit_canvas(tileset):
+    assert len(tileset.tiles) == 4
+    assert tileset.tile_width * 2 <= CANVAS_SIZE
+    assert tileset.tile_height * 2 <= CANVAS_SIZE
+    assert tileset.correct_positions[3] == (tileset.tile_width, tileset.tile_height)
+
+
+def test_snap_to_nearest_cell(tileset):
+    w, h = tileset.tile_width, tileset.tile_height
+    assert tileset.snap(w - 10, 12, CANVAS_SIZE) == (w, 0)
+    assert tileset.snap(w // 2 - 1, h // 2 + 1, CANVAS_SIZE) == (0, h)
+
+
+def test_snap_keeps_tile_on_canvas(tileset):
+    w, h = tileset.tile_width, tileset.tile_height
+    max_x = (CANVAS_SIZE // w - 1) * w
+    max_y = (CANVAS_SIZE // h - 1) * h
+    assert tileset.snap(-40, -40, CANVAS_SIZE) == (0, 0)
+    assert tileset.snap(CANVAS_SIZE + 40, CANVAS_SIZE + 40, CANVAS_SIZE) == (max_x, max_y)
+
+
+def test_solved_positions_snap_to_themselves(tileset):
+    for x, y in tileset.correct_positions:
+        assert tileset.snap(x + 3, y - 3, CANVAS_SIZE) == (x, y)
+
+
+def test_tileset_is_cached(tileset):
+    assert get_tileset(tileset.path, 2, 2, CANVAS_SIZE) is tileset
+
+
+def test_generated_puzzle_is_on_canvas():
+    pool = PuzzlePool(CAPTCHA_DIR, canvas_size=CANVAS_SIZE)
+    puzzle = pool.generate()
+    assert len(puzzle.positions) == len(puzzle.tileset.tiles)
+    for x, y in puzzle.positions:
+        assert 0 <= x <= CANVAS_SIZE - puzzle.tileset.tile_width
+        assert 0 <= y <= CANVAS_SIZE - puzzle.tileset.tile_height
+
+
+def test_try_pop_does_not_generate():
+    pool = PuzzlePool(CAPTCHA_DIR, canvas_size=CANVAS_SIZE)
+    assert pool.try_pop() is None
+    assert pool.pop() is not None
+
+
+def test_background_fill_up_to_capacity():
+    pool = PuzzlePool(CAPTCHA_DIR, capacity=3, canvas_size=CANVAS_SIZE).start()
+    try:
+        for _ in range(3):
+            assert pool.pop() is not None
+        deadline = time.monotonic() + 5
+        while len(pool) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(pool) == 3
+        assert pool.try_pop() is not None
+    finally:
+        pool.stop()
+
+
+def test_missing_images(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PuzzlePool(tmp_path)
@@ -0,0 +1,447 @@
+import threading
+import time
+import weakref
+
+from mysql.connector import Error, InterfaceError, OperationalError
+
+from utils.cache import TTLCache
+from utils.database.backends import DB_CONFIG, MySQLBackend, StorageBackend, default_backend
+from utils.database.sqlite import SQLiteBackend
+from utils.metrics import QueryMetrics, row_size
+from utils.passwords import PasswordHasher
+from utils.pool import ConnectionPool
+from utils.schema import DEFAULT_CACHE_PATH, EVENT_FIELDS, EVENTS_TABLE, SchemaCache
+
+__all__ = [
+    'Connector', 'Database',
+    # Хранилища из utils.database.backends и utils.database.sqlite
+    'DB_CONFIG', 'StorageBackend', 'MySQLBackend', 'SQLiteBackend', 'default_backend',
+    'AUTH_QUERY', 'AUTH_ROLES', 'CREDENTIALS_TABLE', 'CREDENTIALS_AUTH_QUERY',
+    'EVENT_SUMMARY_TABLE', 'EVENT_SUMMARY_QUERY', 'EVENT_PROJECTION_QUERY', 'CITIES_TABLE',
+]
+
+# Модераторы, организаторы и участники ищутся по почте одним запросом;
+# пароль проверяется по хешу на клиенте, при совпадении почты в
+# нескольких таблицах приоритет у первой роли
+AUTH_QUERY = """
+    SELECT 'moderator' AS role, 1 AS priority, id, имя, почта, пароль
+      FROM модераторы WHERE почта = %s
+    UNION ALL
+    SELECT 'organizer', 2, id, имя, почта, пароль
+      FROM организаторы WHERE почта = %s
+    UNION ALL
+    SELECT 'participant', 3, id, имя, почта, пароль
+      FROM участники WHERE почта = %s
+    ORDER BY priority
+"""
+
+# Роли, которые могут войти: таблица -> (роль, приоритет)
+AUTH_ROLES = {
+    'модераторы': ('moderator', 1),
+    'организаторы': ('organizer', 2),
+    'участники': ('participant', 3),
+}
+
+# Общая таблица учётных данных (см. utils.migrations): поиск по индексу
+# почты, имя подтягивается по первичному ключу таблицы роли
+CREDENTIALS_TABLE = 'credentials'
+CREDENTIALS_AUTH_QUERY = f"""
+    SELECT c.role, c.priority, COALESCE(m.id, o.id, u.id) AS id,
+           COALESCE(m.имя, o.имя, u.имя) AS имя, c.email AS почта, c.hash AS пароль
+      FROM `{CREDENTIALS_TABLE}` c
+      LEFT JOIN модераторы m ON c.role = 'moderator' AND m.id = c.user_id
+      LEFT JOIN организаторы o ON c.role = 'organizer' AND o.id = c.user_id
+      LEFT JOIN участники u ON c.role = 'participant' AND u.id = c.user_id
+     WHERE c.email = %s
+     ORDER BY c.priority
+"""
+
+# Узкая сводка мероприятий для списка: только поля карточки и поиска,
+# название города уже подставлено. Таблица сводки поддерживается
+# триггерами (utils.migrations, utils.database.sqlite); без неё те же
+# столбцы читаются запросом EVENT_SUMMARY_QUERY
+EVENT_SUMMARY_TABLE = 'мероприятия_сводка'
+EVENT_SUMMARY_QUERY = """
+    SELECT e.`№`, e.Событие, e.DATE, e.DAYS, e.Город, g.название AS город_название
+      FROM мероприятия_it e
+      LEFT JOIN город g ON g.id = e.Город
+"""
+# Та же проекция для базы без таблицы город: вместо названия номер города
+EVENT_PROJECTION_QUERY = """
+    SELECT `№`, Событие, DATE, DAYS, Город, NULL AS город_название
+      FROM мероприятия_it
+"""
+CITIES_TABLE = 'город'
+
+
+class Connector:
+    def __init__(self, pool_size=5, cache_size=1024, cache_ttl=300,
+                 schema_cache_path=DEFAULT_CACHE_PATH, slow_query_ms=200,
+                 slow_log_path=None, backend=None, **config):
+        """Создание пула соединений с базой данных
+
+        backend — хранилище (MySQLBackend, SQLiteBackend); по умолчанию
+        выбирается переменной TEST_EXAM_DB_BACKEND, config — параметры MySQL.
+        """
+        self.backend = backend if backend is not None else default_backend(**config)
+        self.pool = ConnectionPool(self._connect, size=pool_size)
+        # Кэш строк по ключу (таблица, id)
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # Подготовленные курсоры: соединение -> {текст запроса: курсор}
+        self._prepared = weakref.WeakKeyDictionary()
+        self._prepared_lock = threading.Lock()
+        self.schema_cache_path = schema_cache_path
+        self._schema = None
+        self._schema_lock = threading.Lock()
+        # Проверка хешей паролей в своём пуле потоков
+        self.passwords = PasswordHasher()
+        # Время, строки и объём по каждому запросу; журнал медленных запросов
+        self.metrics = QueryMetrics(slow_threshold=slow_query_ms / 1000,
+                                    slow_log_path=slow_log_path)
+
+        try:
+            with self.pool.connection() as con:
+                if con.is_connected():
+                    print(f"Успешное подключение к базе данных ({self.backend.name})")
+            # Схема читается один раз при запуске (или берётся из файла)
+            self.schema
+
+        except Error as e:
+            print(f"Ошибка подключения к базе данных: {e}")
+
+    def _connect(self):
+        return self.backend.connect()
+
+    def _prepared_cursor(self, con, query):
+        """Подготовленный курсор запроса; на каждом соединении готовится один раз"""
+        with self._prepared_lock:
+            statements = self._prepared.setdefault(con, {})
+            cur = statements.get(query)
+        if cur is None:
+            cur = con.cursor(prepared=True, dictionary=True)
+            with self._prepared_lock:
+                statements[query] = cur
+        return cur
+
+    def _discard_prepared(self, con, query):
+        """Удаление курсора из реестра после ошибки; запрос подготовится заново"""
+        with self._prepared_lock:
+            cur = self._prepared.get(con, {}).pop(query, None)
+        if cur is not None:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+    def _execute(self, query, params=None, fetch="all", prepared=False):
+        """Выполнение запроса на соединении из пула с одним переподключением
+
+        prepared=True — для частых запросов: сервер разбирает текст один
+        раз на соединение, дальше передаются только параметры.
+        """
+        for attempt in (1, 2):
+            con = self.pool.checkout()
+            cur = None
+            start = time.perf_counter()
+            try:
+                if prepared:
+                    # Курсор остаётся в реестре и не закрывается в finally
+                    prepared_cur = self._prepared_cursor(con, query)
+                    try:
+                        prepared_cur.execute(query, params)
+                        # Подготовленный курсор не буферизуется: дочитываем результат
+                        rows = prepared_cur.fetchall()
+                    except BaseException:
+                        self._discard_prepared(con, query)
+                        raise
+                    self._record(query, start, rows)
+                    if fetch == "one":
+                        return rows[0] if rows else None
+                    return rows
+                cur = con.cursor(buffered=True, dictionary=True)
+                cur.execute(query, params)
+                if fetch == "one":
+                    row = cur.fetchone()
+                    self._record(query, start, [row] if row else [])
+                    return row
+                rows = cur.fetchall()
+                self._record(query, start, rows)
+                return rows
+            except (OperationalError, InterfaceError) as e:
+                self.metrics.record(query, time.perf_counter() - start, error=e)
+                cur = None
+                self.pool.checkin(con, broken=True)
+                con = None
+                if attempt == 2:
+                    raise
+            except Error as e:
+                self.metrics.record(query, time.perf_counter() - start, error=e)
+                raise
+            finally:
+                if cur is not None:
+                    cur.close()
+                if con is not None:
+                    self.pool.checkin(con)
+
+    def _stream(self, query, params=None, size=500):
+        """Построчная выборка через небуферизованный курсор
+
+        Строки читаются с сервера порциями по size, без копии всего
+        результата в памяти клиента. Соединение занято до конца обхода.
+        """
+        with self.pool.connection() as con:
+            cur = con.cursor(buffered=False, dictionary=True)
+            start = time.perf_counter()
+            count = nbytes = 0
+            error = None
+            try:
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    nbytes += sum(row_size(row) for row in rows)
+                    yield from rows
+            except Error as e:
+                error = e
+                raise
+            finally:
+                # Время включает обработку строк вызывающим кодом
+                self.metrics.record(query, time.perf_counter() - start, count, nbytes, error)
+                # Обход мог быть прерван: остаток результата нужно дочитать
+                if getattr(con, "unread_result", False):
+                    con.consume_results()
+                cur.close()
+
+    @property
+    def schema(self):
+        """Карта таблиц и столбцов; читается один раз
+
+        Если чтение не удалось (база недоступна), пустая схема не
+        запоминается и следующее обращение читает каталог снова.
+        """
+        with self._schema_lock:
+            if self._schema is None:
+                backend = self.backend
+                schema = SchemaCache(self.schema_cache_path).load(
+                    self._execute, backend.version_query, backend.columns_query, backend.schema_tag)
+                if not schema.loaded:
+                    return schema
+                self._schema = schema
+            return self._schema
+
+    def _record(self, query, start, rows):
+        self.metrics.record(query, time.perf_counter() - start, len(rows),
+                            sum(row_size(row) for row in rows))
+
+    def query_stats(self):
+        """Статистика запросов и журнал медленных запросов"""
+        return self.metrics.snapshot()
+
+    def pool_stats(self):
+        """Статистика пула соединений"""
+        return self.pool.stats()
+
+    def cache_stats(self):
+        """Статистика кэша строк"""
+        return self.cache.stats()
+
+    def disconnect(self):
+        """Закрытие соединений с базой данных"""
+        self.pool.close()
+        self.passwords.shutdown()
+        print("Соединение с базой данных закрыто")
+
+
+class Database(Connector):
+    def auth_user(self, email, password):
+        """Авторизация пользователя за один запрос ко всем ролям"""
+        if self.schema.has_table(CREDENTIALS_TABLE):
+            users = self._execute(CREDENTIALS_AUTH_QUERY, (email,), prepared=True)
+        else:
+            users = self._execute(AUTH_QUERY, (email,) * 3, prepared=True)
+
+        for user in users:
+            if user["id"] is None:
+                # Запись credentials без строки в таблице роли
+                continue
+            stored = user.pop("пароль")
+            role = user.pop("role")
+            user.pop("priority", None)
+            if self.passwords.verify(password, stored):
+                return {"role": role, "data": user}
+
+        return None
+
+    def get_events(self):
+        """Получение всех мероприятий из базы данных"""
+        try:
+            # Предполагаем, что таблица называется 'мероприятия'
+            return self._cache_events(list(self.stream_events()))
+        except Error as e:
+            print(f"Ошибка при получении мероприятий: {e}")
+            # Если таблица имеет другое имя, попробуем найти её
+            return self._find_events_table()
+
+    def stream_events(self, size=500):
+        """Потоковый обход всех мероприятий в порядке даты"""
+        return self._stream("""SELECT * FROM мероприятия_it ORDER BY DATE""", size=size)
+
+    def get_events_page(self, page_size=50, after=None):
+        """Страница мероприятий, следующая за ключом after = (DATE, №)"""
+        return self._cache_events(self._page("мероприятия_it", page_size, after))
+
+    def iter_events(self, page_size=50, after=None):
+        """Постраничный обход мероприятий по ключу (DATE, №) без OFFSET
+
+        Ошибки базы передаются вызывающему коду. Если основной таблицы
+        нет, а по схеме найдена другая таблица мероприятий, она читается
+        целиком и отдаётся порциями по page_size.
+        """
+        table = self.schema.events_table()
+        if table is None or table == EVENTS_TABLE:
+            return self._iter_pages(self.get_events_page, page_size, after)
+        return self._iter_table(table, page_size)
+
+    def _iter_table(self, table, page_size):
+        rows = self._cache_events(list(self._stream(f"SELECT * FROM `{table}`")))
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+    def _event_summaries_source(self):
+        """Источник сводки или None, если мероприятия лежат не в мероприятия_it"""
+        schema = self.schema
+        if schema.has_table(EVENT_SUMMARY_TABLE):
+            return f"`{EVENT_SUMMARY_TABLE}`"
+        if schema.events_table() not in (None, EVENTS_TABLE):
+            return None
+        if schema.has_table(CITIES_TABLE):
+            return f"({EVENT_SUMMARY_QUERY}) AS s"
+        return f"({EVENT_PROJECTION_QUERY}) AS s"
+
+    def get_event_summaries(self):
+        """Сводка всех мероприятий: №, Событие, DATE, DAYS, Город и город_название"""
+        source = self._event_summaries_source()
+        if source is None:
+            return self._cache_events(self._find_events_table())
+        try:
+            return list(self._stream(f"SELECT * FROM {source} ORDER BY DATE, `№`"))
+        except Error as e:
+            print(f"Ошибка при получении мероприятий: {e}")
+            return []
+
+    def get_event_summaries_page(self, page_size=50, after=None):
+        """Страница сводки мероприятий, следующая за ключом after = (DATE, №)
+
+        Строки сводки не попадают в кэш строк: полное мероприятие
+        читается отдельно (get_event_by_id).
+        """
+        source = self._event_summaries_source()
+        if source is None:
+            return self.get_events_page(page_size, after)
+        return self._page(source, page_size, after)
+
+    def iter_event_summaries(self, page_size=50, after=None):
+        """Постраничный обход сводки мероприятий по ключу (DATE, №)
+
+        Без мероприятия_it обход идёт по полным строкам (iter_events).
+        """
+        if self._event_summaries_source() is None:
+            return self.iter_events(page_size, after)
+        return self._iter_pages(self.get_event_summaries_page, page_size, after)
+
+    def _page(self, source, page_size, after):
+        if after is None:
+            return self._execute(f"""SELECT * FROM {source} ORDER BY DATE, `№` LIMIT %s""",
+                                 (page_size,))
+        date, number = after
+        # NULL в DATE идут первыми (и в MySQL, и в SQLite), а DATE > NULL
+        # не выполняется ни для одной строки — для них отдельное условие
+        if date is None:
+            return self._execute(f"""SELECT * FROM {source}
+                                     WHERE (DATE IS NULL AND `№` > %s) OR DATE IS NOT NULL
+                                     ORDER BY DATE, `№` LIMIT %s""",
+                                 (number, page_size))
+        return self._execute(f"""SELECT * FROM {source}
+                                 WHERE DATE > %s OR (DATE = %s AND `№` > %s)
+                                 ORDER BY DATE, `№` LIMIT %s""",
+                             (date, date, number, page_size))
+
+    def _iter_pages(self, get_page, page_size, after):
+        while True:
+            page = get_page(page_size, after)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            after = (last['DATE'], last['№'])
+
+    def _find_events_table(self):
+        """Поиск таблицы с мероприятиями по кэшу схемы"""
+        table_name = self.schema.events_table()
+        if not table_name:
+            return []
+        try:
+            return list(self._stream(f"SELECT * FROM `{table_name}`"))
+        except Error as e:
+            print(f"Ошибка при поиске таблицы: {e}")
+        return []
+
+    def event_field(self, event, name):
+        """Значение необязательного поля мероприятия ('organizer', 'location', 'time')"""
+        aliases = EVENT_FIELDS[name]
+        schema = self.schema
+        if schema.loaded:
+            column = schema.column(schema.events_table(), aliases)
+            return event.get(column) if column else None
+        # Схема недоступна: перебираем возможные имена столбцов
+        return next((event[column] for column in aliases if event.get(column)), None)
+
+    def _cache_events(self, events):
+        """Заполнение кэша строками мероприятий из списка"""
+        for event in events:
+            if event.get('№') is not None:
+                self.cache.set(('мероприятия_it', event['№']), event)
+        return events
+
+    def invalidate_event(self, event_id):
+        """Сброс мероприятия из кэша после изменения или удаления"""
+        self.cache.invalidate(('мероприятия_it', event_id))
+
+    def get_event_by_id(self, event_id):
+        """Получение мероприятия по ID"""
+        key = ('мероприятия_it', event_id)
+        event = self.cache.get(key)
+        if event is not None:
+            return event
+
+        try:
+            event = self._execute("""SELECT * FROM мероприятия_it WHERE `№` = %s""", (event_id,),
+                                  fetch="one", prepared=True)
+        except Error as e:
+            print(f"Ошибка при получении мероприятия: {e}")
+            return None
+
+        if event:
+            self.cache.set(key, event)
+        return event
+
+    def get_organizer_by_id(self, organizer_id):
+        """Получение информации об организаторе по ID"""
+        key = ('организаторы', organizer_id)
+        organizer = self.cache.get(key)
+        if organizer is not None:
+            return organizer
+
+        try:
+            organizer = self._execute("""SELECT имя, почта FROM организаторы WHERE id = %s""", (organizer_id,),
+                                      fetch="one", prepared=True)
+            if organizer:
+                self.cache.set(key, organizer)
+            return organizer
+        except Error as e:
+            print(f"Ошибка при получении организатора: {e}")
+            return {"имя": "Неизвестно", "почта": "Нет данных"}
@@ -0,0 +1,79 @@
+import os
+
+import mysql.connector
+
+from utils.schema import COLUMNS_QUERY, VERSION_QUERY
+
+# Параметры соединения MySQL из окружения, как и выбор хранилища;
+# значения LOCAL_DB_CONFIG — только запасной вариант для локальной разработки
+DB_CONFIG_ENV = {
+    'host': "TEST_EXAM_DB_HOST",
+    'user': "TEST_EXAM_DB_USER",
+    'password': "TEST_EXAM_DB_PASSWORD",
+    'database': "TEST_EXAM_DB_NAME",
+}
+LOCAL_DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'UM8$7I9o',
+    'database': 'test_exam',
+}
+DB_CONFIG = {key: os.environ.get(env, LOCAL_DB_CONFIG[key]) for key, env in DB_CONFIG_ENV.items()}
+
+# Выбор хранилища без правки кода: mysql (по умолчанию) или sqlite
+BACKEND_ENV = "TEST_EXAM_DB_BACKEND"
+SQLITE_PATH_ENV = "TEST_EXAM_SQLITE_PATH"
+
+
+class StorageBackend:
+    """Хранилище для Connector: создаёт соединения и описывает свой каталог
+
+    Соединения должны иметь интерфейс mysql.connector (cursor с
+    dictionary/buffered/prepared, commit, close, is_connected), запросы
+    пишутся с параметрами %s, ошибки — классы mysql.connector.
+    """
+
+    name = None
+    # Запросы каталога для SchemaCache: число таблиц и версия, столбцы таблиц
+    version_query = None
+    columns_query = None
+
+    def connect(self):
+        raise NotImplementedError
+
+    @property
+    def schema_tag(self):
+        """Метка базы в кэше схемы"""
+        return self.name
+
+
+class MySQLBackend(StorageBackend):
+    """Сервер MySQL через mysql.connector"""
+
+    name = "mysql"
+    version_query = VERSION_QUERY
+    columns_query = COLUMNS_QUERY
+
+    def __init__(self, **config):
+        self.config = {**DB_CONFIG, **config}
+
+    def connect(self):
+        return mysql.connector.connect(**self.config)
+
+    @property
+    def schema_tag(self):
+        return f"mysql:{self.config.get('host')}/{self.config.get('database')}"
+
+    def __repr__(self):
+        return f"MySQLBackend({self.config.get('host')}/{self.config.get('database')})"
+
+
+def default_backend(**config):
+    """Хранилище из переменных окружения; config — параметры соединения MySQL"""
+    name = os.environ.get(BACKEND_ENV, "mysql").lower()
+    if name == "sqlite":
+        from utils.database.sqlite import DEFAULT_PATH, SQLiteBackend
+        return SQLiteBackend(os.environ.get(SQLITE_PATH_ENV) or DEFAULT_PATH)
+    if name != "mysql":
+        raise ValueError(f"Неизвестное хранилище {name!r} в {BACKEND_ENV}: mysql или sqlite")
+    return MySQLBackend(**config)
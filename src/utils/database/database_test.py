@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+from mysql.connector import Error, OperationalError
+
+
+def set_null_dates(path, numbers):
+    con = sqlite3.connect(str(path))
+    con.executemany("UPDATE мероприятия_it SET DATE = NULL WHERE `№` = ?", [(n,) for n in numbers])
+    con.commit()
+    con.close()
+
+
+def event_numbers(pages):
+    return [row['№'] for page in pages for row in page]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 1000])
+def test_iter_events_returns_every_row_once(db, page_size):
+    expected = [row['№'] for row in db.get_events()]
+    numbers = event_numbers(db.iter_events(page_size=page_size))
+    assert sorted(numbers) == sorted(expected)
+    assert len(numbers) == len(set(numbers))
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 5])
+def test_pagination_keeps_rows_after_null_dates(sqlite_path, db, page_size):
+    set_null_dates(sqlite_path, [3, 7])
+    total = len(db.get_events())
+
+    events = event_numbers(db.iter_events(page_size=page_size))
+    summaries = event_numbers(db.iter_event_summaries(page_size=page_size))
+
+    assert len(events) == total
+    assert len(set(events)) == total
+    # NULL идут первыми, дальше строки по возрастанию даты
+    assert events[:2] == [3, 7]
+    assert summaries == events
+
+
+def test_page_resumes_after_null_date(sqlite_path, db):
+    set_null_dates(sqlite_path, [3, 7])
+    page = db.get_events_page(page_size=2, after=(None, 3))
+    assert [row['№'] for row in page][0] == 7
+    assert page[1]['DATE'] is not None
+
+
+def prepared_queries(db):
+    return {query for statements in db._prepared.values() for query in statements}
+
+
+def test_prepared_cursor_is_reused(db):
+    query = "SELECT * FROM жюри WHERE почта = %s"
+    db._execute(query, ("gregorio35@yahoo.com",), prepared=True)
+    cursors = [statements[query] for statements in db._prepared.values()]
+    db._execute(query, ("gregorio35@yahoo.com",), prepared=True)
+    assert [statements[query] for statements in db._prepared.values()] == cursors
+
+
+def test_failed_prepared_cursor_is_discarded(db):
+    query = "SELECT * FROM жюри WHERE почта = %s"
+    with pytest.raises(Error):
+        db._execute(query, ("a", "лишний параметр"), prepared=True)
+    assert query not in prepared_queries(db)
+    # Запрос готовится заново и выполняется
+    assert db._execute(query, ("gregorio35@yahoo.com",), prepared=True)
+
+
+def test_auth_user(db):
+    user = db.auth_user("jmcnamara@comcast.net", "TRgd|ML5")
+    assert user["role"] == "participant"
+    assert user["data"]["почта"] == "jmcnamara@comcast.net"
+    assert "пароль" not in user["data"]
+    assert db.auth_user("jmcnamara@comcast.net", "неверный") is None
+    assert db.auth_user("nobody@example.com", "TRgd|ML5") is None
+
+
+def test_event_summaries_have_city_names(db):
+    summaries = db.get_event_summaries()
+    assert len(summaries) == len(db.get_events())
+    assert all(row['город_название'] for row in summaries if row['Город'])
+
+
+def test_schema_is_read_again_after_failed_load(db, monkeypatch):
+    execute = db._execute
+    calls = []
+
+    def unavailable_once(query, params=None, fetch="all", prepared=False):
+        calls.append(query)
+        if len(calls) == 1:
+            raise OperationalError(msg="база недоступна")
+        return execute(query, params, fetch, prepared)
+
+    monkeypatch.setattr(db, "_execute", unavailable_once)
+    # Как при запуске: схема ещё не прочитана
+    db._schema = None
+    assert not db.schema.loaded
+    assert db.schema.loaded
+    assert db.schema.has_table('мероприятия_it')
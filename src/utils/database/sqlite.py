@@ -0,0 +1,272 @@
+"""Встроенное хранилище SQLite: база из import_csv без сервера MySQL
+
+Файл базы создаётся при первом соединении из каталога csv_dir (те же
+описания таблиц, что у utils.importer) и дальше открывается как есть.
+Журнал WAL позволяет читать из нескольких соединений пула во время
+записи, файл отображается в память (mmap_size).
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from mysql.connector import DatabaseError, IntegrityError
+
+from utils.database.backends import StorageBackend
+
+DEFAULT_PATH = Path(__file__).resolve().parents[3] / ".test_exam.sqlite3"
+CSV_DIR = Path(__file__).resolve().parents[3] / "import_csv"
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+# Столбцы с целыми числами; остальные — текст
+INTEGER_COLUMNS = {'id', '№', 'DAYS', 'Город', 'страна', 'мероприятие', 'дни', 'день'}
+
+# Индексы под запросы Database: вход по почте, страницы списка по (DATE, №)
+INDEXES = """
+CREATE INDEX idx_модераторы_почта ON модераторы (почта);
+CREATE INDEX idx_жюри_почта ON жюри (почта);
+CREATE INDEX idx_организаторы_почта ON организаторы (почта);
+CREATE INDEX idx_участники_почта ON участники (почта);
+CREATE INDEX idx_мероприятия_дата ON мероприятия_it (DATE, `№`);
+CREATE INDEX idx_активности_мероприятие ON активности (мероприятие);
+"""
+
+# Сводка мероприятий для списка (см. EVENT_SUMMARY_TABLE) и триггеры, как в utils.migrations
+EVENT_SUMMARY_DDL = """
+CREATE TABLE `{table}` (`№` INTEGER PRIMARY KEY, Событие TEXT, DATE TEXT, DAYS INTEGER,
+                        Город INTEGER, город_название TEXT);
+INSERT INTO `{table}` {query};
+CREATE INDEX idx_сводка_дата ON `{table}` (DATE, `№`);
+CREATE INDEX idx_сводка_город ON `{table}` (Город);
+
+CREATE TRIGGER мероприятия_it_сводка_insert AFTER INSERT ON мероприятия_it BEGIN
+    INSERT OR REPLACE INTO `{table}` VALUES (NEW.`№`, NEW.Событие, NEW.DATE, NEW.DAYS, NEW.Город,
+                                            (SELECT название FROM город WHERE id = NEW.Город));
+END;
+CREATE TRIGGER мероприятия_it_сводка_update AFTER UPDATE ON мероприятия_it BEGIN
+    DELETE FROM `{table}` WHERE `№` = OLD.`№`;
+    INSERT OR REPLACE INTO `{table}` VALUES (NEW.`№`, NEW.Событие, NEW.DATE, NEW.DAYS, NEW.Город,
+                                            (SELECT название FROM город WHERE id = NEW.Город));
+END;
+CREATE TRIGGER мероприятия_it_сводка_delete AFTER DELETE ON мероприятия_it BEGIN
+    DELETE FROM `{table}` WHERE `№` = OLD.`№`;
+END;
+CREATE TRIGGER город_сводка_insert AFTER INSERT ON город BEGIN
+    UPDATE `{table}` SET город_название = NEW.название WHERE Город = NEW.id;
+END;
+CREATE TRIGGER город_сводка_update AFTER UPDATE ON город BEGIN
+    UPDATE `{table}` SET город_название = CASE WHEN Город = NEW.id THEN NEW.название END
+     WHERE Город IN (OLD.id, NEW.id);
+END;
+CREATE TRIGGER город_сводка_delete AFTER DELETE ON город BEGIN
+    UPDATE `{table}` SET город_название = NULL WHERE Город = OLD.id;
+END;
+"""
+
+# schema_version меняется при любом изменении схемы, включая ADD COLUMN
+VERSION_QUERY = """
+    SELECT COUNT(*) AS columns_count,
+           (SELECT schema_version FROM pragma_schema_version) AS checksum
+    FROM sqlite_master m JOIN pragma_table_info(m.name) c
+    WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%'
+"""
+
+COLUMNS_QUERY = """
+    SELECT m.name AS table_name, c.name AS column_name
+    FROM sqlite_master m JOIN pragma_table_info(m.name) c
+    WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.name, c.cid
+"""
+
+
+def _error(e):
+    """Ошибка sqlite3 в виде класса mysql.connector, как у сервера"""
+    if isinstance(e, sqlite3.IntegrityError):
+        return IntegrityError(msg=str(e))
+    return DatabaseError(msg=str(e))
+
+
+class SQLiteCursor:
+    """Курсор с интерфейсом mysql.connector поверх sqlite3
+
+    latency — имитация задержки сети на запрос для сравнения с MySQL.
+    """
+
+    def __init__(self, con, latency=0.0, dictionary=False):
+        self._cur = con.cursor()
+        self._latency = latency
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def execute(self, query, params=None):
+        if self._latency:
+            time.sleep(self._latency)
+        try:
+            self._cur.execute(query.replace("%s", "?"), params or ())
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def executemany(self, query, rows):
+        if self._latency:
+            time.sleep(self._latency)
+        try:
+            self._cur.executemany(query.replace("%s", "?"), rows)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    def _row(self, row):
+        if not self._dictionary:
+            return row
+        return dict(zip((d[0] for d in self._cur.description), row))
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return self._row(row) if row is not None else None
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cur.fetchall()]
+
+    def fetchmany(self, size):
+        return [self._row(row) for row in self._cur.fetchmany(size)]
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteConnection:
+    """Соединение с интерфейсом mysql.connector поверх sqlite3
+
+    Курсоры с prepared=True не отличаются от обычных: sqlite3 сам держит
+    кэш разобранных запросов на соединение (cached_statements).
+    """
+
+    def __init__(self, path, latency=0.0, mmap_size=DEFAULT_MMAP_SIZE):
+        # Пул отдаёт соединение одному потоку за раз, но не всегда тому, что его создал
+        self._con = sqlite3.connect(str(path), check_same_thread=False, cached_statements=256)
+        self.latency = latency
+        self._con.execute("PRAGMA journal_mode = WAL")
+        self._con.execute("PRAGMA synchronous = NORMAL")
+        self._con.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+        self._con.execute("PRAGMA temp_store = MEMORY")
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._con, self.latency, dictionary)
+
+    def is_connected(self):
+        try:
+            self._con.execute("SELECT 1")
+        except sqlite3.Error:
+            return False
+        return True
+
+    def start_transaction(self):
+        if not self._con.in_transaction:
+            self._con.execute("BEGIN")
+
+    def commit(self):
+        self._con.commit()
+
+    def rollback(self):
+        self._con.rollback()
+
+    def close(self):
+        self._con.close()
+
+
+def column_type(column):
+    return "INTEGER" if column in INTEGER_COLUMNS or column.endswith("_id") else "TEXT"
+
+
+def table_ddl(spec):
+    """CREATE TABLE по описанию utils.importer; без столбца id добавляется суррогатный ключ"""
+    columns = spec.db_columns
+    key = next((c for c in ('id', '№') if c in columns), None)
+    parts = [] if key else ["id INTEGER PRIMARY KEY"]
+    for column in columns:
+        parts.append(f"`{column}` {column_type(column)}{' PRIMARY KEY' if column == key else ''}")
+    return f"CREATE TABLE `{spec.table}` ({', '.join(parts)})"
+
+
+def build(path, csv_dir=CSV_DIR, hash_passwords=True, batch_size=5000):
+    """Создание файла базы из import_csv; файл появляется только целиком"""
+    from utils.database import EVENT_SUMMARY_QUERY, EVENT_SUMMARY_TABLE
+    from utils.importer import TABLES, build_lookup, insert_batches, read_rows
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    start = time.perf_counter()
+    con = sqlite3.connect(str(tmp))
+    try:
+        cur = SQLiteCursor(con)
+        for spec in TABLES:
+            cur.execute(table_ddl(spec))
+        for spec in TABLES:
+            lookups = {t: build_lookup(cur, t) for t in set(spec.references.values())}
+            rows = read_rows(spec, csv_dir, lookups, hash_passwords)
+            insert_batches(cur, spec, rows, batch_size)
+        # Индексы после загрузки строятся быстрее, чем при каждой вставке
+        con.executescript(INDEXES)
+        con.executescript(EVENT_SUMMARY_DDL.format(table=EVENT_SUMMARY_TABLE, query=EVENT_SUMMARY_QUERY))
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    print(f"База SQLite {path} создана из {csv_dir} за {time.perf_counter() - start:.1f} c")
+
+
+class SQLiteBackend(StorageBackend):
+    """Файл SQLite вместо сервера: офлайн-режим, замеры и проверки без MySQL
+
+    Если файла нет и задан csv_dir, база создаётся из него при первом
+    соединении. csv_dir=None — открыть существующий файл как есть.
+    """
+
+    name = "sqlite"
+    version_query = VERSION_QUERY
+    columns_query = COLUMNS_QUERY
+
+    def __init__(self, path=DEFAULT_PATH, csv_dir=CSV_DIR, hash_passwords=True,
+                 mmap_size=DEFAULT_MMAP_SIZE, latency=0.0):
+        self.path = Path(path)
+        self.csv_dir = csv_dir
+        self.hash_passwords = hash_passwords
+        self.mmap_size = mmap_size
+        self.latency = latency
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def ensure_built(self):
+        with self._lock:
+            if self._ready:
+                return
+            if self.csv_dir is not None and not self.path.exists():
+                try:
+                    build(self.path, self.csv_dir, self.hash_passwords)
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    raise _error(e) from e
+            self._ready = True
+
+    def connect(self):
+        self.ensure_built()
+        try:
+            return SQLiteConnection(self.path, self.latency, self.mmap_size)
+        except sqlite3.Error as e:
+            raise _error(e) from e
+
+    @property
+    def schema_tag(self):
+        return f"sqlite:{self.path.resolve()}"
+
+    def __repr__(self):
+        return f"SQLiteBackend({self.path})"
@@ -0,0 +1,177 @@
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+TOKEN_RE = re.compile(r"\w+")
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y", "%Y-%m-%d %H:%M:%S")
+# Дата словами, как в import_csv: «3 апреля 2022 г.»
+MONTHS = ("января", "февраля", "марта", "апреля", "мая", "июня", "июля",
+          "августа", "сентября", "октября", "ноября", "декабря")
+WORD_DATE_RE = re.compile(r"(\d{1,2})\s+([а-яё]+)\s+(\d{4})(?:\s*г\.?)?$")
+
+# Порядок сортировки: имя -> ключ события
+SORT_KEYS = {
+    'date': None,  # порядок индекса
+    'title': lambda event: str(event.get('Событие') or '').lower(),
+    'days': lambda event: event.get('DAYS') or 0,
+}
+
+
+def city_of(event):
+    """Город мероприятия: название из сводки или номер из полной строки"""
+    return str(event.get('город_название') or event.get('Город') or '')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or '').lower())
+
+
+def parse_date(value):
+    """Дата в виде ГГГГ-ММ-ДД или None, если значение не похоже на дату"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    match = WORD_DATE_RE.match(text.lower())
+    if match and match.group(2) in MONTHS:
+        try:
+            return date(int(match.group(3)), MONTHS.index(match.group(2)) + 1,
+                        int(match.group(1))).isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+def date_key(value):
+    """Ключ даты для сравнения; нераспознанные строки сравниваются как есть"""
+    if value is None or value == '':
+        return None
+    return parse_date(value) or str(value).strip()
+
+
+class EventIndex:
+    """Индекс загруженных мероприятий для поиска и фильтров без запросов к базе
+
+    Мероприятия хранятся в порядке (дата, №); позиция в этом порядке —
+    идентификатор мероприятия в индексе. Для названия строится обратный
+    индекс слово -> позиции, для даты — отсортированный массив ключей,
+    для города и длительности — корзины позиций.
+    """
+
+    def __init__(self, events=()):
+        self.clear()
+        self.add(events)
+
+    def clear(self):
+        self.events = []
+        self.dates = []
+        self.tokens = {}
+        self.cities = {}
+        self.days = {}
+        self._sort_keys = []
+        self._token_matches = {}
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, events):
+        """Добавление страницы; страницы приходят по порядку, поэтому обычно это дописывание в конец"""
+        events = list(events)
+        if not events:
+            return
+        keys = [self._key(event) for event in events]
+        if self._sort_keys and min(keys) < self._sort_keys[-1]:
+            # Страница не по порядку: индекс перестраивается целиком
+            self._rebuild(self.events + events)
+            return
+        if keys != sorted(keys):
+            order = sorted(range(len(events)), key=keys.__getitem__)
+            events = [events[i] for i in order]
+            keys = [keys[i] for i in order]
+        for event, key in zip(events, keys):
+            self._append(event, key)
+
+    def _key(self, event):
+        return date_key(event.get('DATE')) or '', event.get('№') or 0
+
+    def _rebuild(self, events):
+        events = sorted(events, key=self._key)
+        self.clear()
+        for event in events:
+            self._append(event, self._key(event))
+
+    def _append(self, event, key):
+        position = len(self.events)
+        self.events.append(event)
+        self._sort_keys.append(key)
+        self.dates.append(key[0])
+        for token in set(tokenize(event.get('Событие'))):
+            if token not in self.tokens:
+                self.tokens[token] = []
+                self._token_matches.clear()
+            self.tokens[token].append(position)
+        self.cities.setdefault(city_of(event), []).append(position)
+        self.days.setdefault(event.get('DAYS') or 0, []).append(position)
+
+    def city_values(self):
+        # Номера городов — по числу, названия — по алфавиту
+        return sorted((city for city in self.cities if city),
+                      key=lambda c: (len(c), c) if c.isdigit() else (0, c))
+
+    def days_values(self):
+        return sorted(self.days)
+
+    def _title_positions(self, text):
+        """Позиции мероприятий, в названии которых есть все слова запроса (как подстроки)"""
+        result = None
+        for word in tokenize(text):
+            matches = self._token_matches.get(word)
+            if matches is None:
+                # Словарь названий намного меньше числа мероприятий
+                matches = set()
+                for token, positions in self.tokens.items():
+                    if word in token:
+                        matches.update(positions)
+                self._token_matches[word] = matches
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
+
+    def search(self, text='', city=None, date_from=None, date_to=None, days=None, sort='date'):
+        """Мероприятия, подходящие под все заданные условия"""
+        lo, hi = 0, len(self.events)
+        if date_from:
+            lo = bisect_left(self.dates, date_key(date_from))
+        if date_to:
+            hi = bisect_right(self.dates, date_key(date_to))
+        if lo >= hi:
+            return []
+
+        # Сначала самые узкие наборы, диапазон дат проверяется сравнением позиций
+        candidates = []
+        if city:
+            candidates.append(self.cities.get(str(city), ()))
+        if days not in (None, ''):
+            candidates.append(self.days.get(int(days), ()))
+        if text and text.strip():
+            candidates.append(self._title_positions(text))
+
+        if candidates:
+            candidates.sort(key=len)
+            first, rest = candidates[0], [set(c) if isinstance(c, list) else c for c in candidates[1:]]
+            positions = sorted(p for p in first if lo <= p < hi and all(p in c for c in rest))
+        else:
+            positions = range(lo, hi)
+
+        events = [self.events[p] for p in positions]
+        sort_key = SORT_KEYS.get(sort)
+        if sort_key is not None:
+            events.sort(key=sort_key)
+        return events
@@ -0,0 +1,83 @@
+import pytest
+
+from utils.event_index import EventIndex, city_of, parse_date
+
+
+def event(number, title, date, days=1, city=1, city_name=None):
+    row = {'№': number, 'Событие': title, 'DATE': date, 'DAYS': days, 'Город': city}
+    if city_name:
+        row['город_название'] = city_name
+    return row
+
+
+EVENTS = [
+    event(1, "Форум облачных технологий", "2023-03-10", days=2, city=5, city_name="Казань"),
+    event(2, "Митап по DevOps", "2023-01-15", days=1, city=7, city_name="Пермь"),
+    event(3, "Облачная конференция", "2023-06-01", days=3, city=5, city_name="Казань"),
+    event(4, "Хакатон", None, days=2, city=12),
+]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2023-06-01", "2023-06-01"),
+    ("01.06.2023", "2023-06-01"),
+    ("3 апреля 2022 г.", "2022-04-03"),
+    ("3 Апреля 2022", "2022-04-03"),
+    ("31 февраля 2022 г.", None),
+    ("скоро", None),
+    (None, None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_city_of_prefers_name_from_summary():
+    assert city_of(EVENTS[0]) == "Казань"
+    assert city_of(EVENTS[3]) == "12"
+
+
+def test_events_are_kept_in_date_order():
+    index = EventIndex(EVENTS)
+    # Без даты — в начале, как NULL в ORDER BY DATE
+    assert [e['№'] for e in index.events] == [4, 2, 1, 3]
+
+
+def test_out_of_order_page_rebuilds_index():
+    index = EventIndex(EVENTS[2:3])
+    index.add(EVENTS[:2])
+    assert [e['№'] for e in index.search()] == [2, 1, 3]
+    assert [e['№'] for e in index.search(city="Казань")] == [1, 3]
+
+
+def test_search_by_title_matches_word_prefixes_and_all_words():
+    index = EventIndex(EVENTS)
+    assert [e['№'] for e in index.search("облач")] == [1, 3]
+    assert [e['№'] for e in index.search("облачная конф")] == [3]
+    assert index.search("блокчейн") == []
+
+
+def test_search_by_date_range():
+    index = EventIndex(EVENTS)
+    assert [e['№'] for e in index.search(date_from="2023-02-01")] == [1, 3]
+    assert [e['№'] for e in index.search(date_from="01.02.2023", date_to="2023-03-31")] == [1]
+    assert index.search(date_from="2024-01-01") == []
+
+
+def test_search_combines_filters():
+    index = EventIndex(EVENTS)
+    assert [e['№'] for e in index.search("облач", city="Казань", days=3)] == [3]
+    assert [e['№'] for e in index.search(days="2")] == [4, 1]
+    assert index.search(city="Пермь", days=3) == []
+
+
+def test_search_sorting():
+    index = EventIndex(EVENTS)
+    assert [e['№'] for e in index.search(sort='title')] == [2, 3, 1, 4]
+    assert [e['№'] for e in index.search(sort='days')] == [2, 4, 1, 3]
+
+
+def test_filter_values():
+    index = EventIndex(EVENTS)
+    # Названия по алфавиту, за ними номера городов по числу
+    assert index.city_values() == ["Казань", "Пермь", "12"]
+    assert index.days_values() == [1, 2, 3]
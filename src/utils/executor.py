@@ -0,0 +1,84 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TkExecutor:
+    """Выполнение запросов в пуле потоков с возвратом результатов в цикл Tk"""
+
+    def __init__(self, root, max_workers=4, poll_interval=30):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._done = queue.Queue()
+        self._live = set()
+        self._owners = {}
+        self._poll_id = None
+
+    def submit(self, func, *args, on_success=None, on_error=None, owner=None, **kwargs):
+        """Запуск func в фоне; колбэки вызываются в потоке Tk
+
+        Если передан owner (виджет), запрос отменяется при его уничтожении.
+        """
+        future = self._pool.submit(func, *args, **kwargs)
+        self._live.add(future)
+
+        if owner is not None:
+            if owner not in self._owners:
+                self._owners[owner] = set()
+                owner.bind("<Destroy>", lambda e, w=owner: e.widget is w and self.cancel(w), add="+")
+            self._owners[owner].add(future)
+
+        future.add_done_callback(lambda f: self._done.put((f, on_success, on_error, owner)))
+        self._schedule_poll()
+        return future
+
+    def cancel(self, owner):
+        """Отмена всех запросов виджета; результаты уже запущенных отбрасываются"""
+        for future in self._owners.pop(owner, ()):
+            future.cancel()
+            self._live.discard(future)
+
+    def shutdown(self):
+        """Остановка пула потоков"""
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._live.clear()
+        self._owners.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Разбор готовых результатов в потоке Tk"""
+        self._poll_id = None
+        while True:
+            try:
+                future, on_success, on_error, owner = self._done.get_nowait()
+            except queue.Empty:
+                break
+
+            if future not in self._live:
+                continue
+            self._live.discard(future)
+            if owner is not None and owner in self._owners:
+                self._owners[owner].discard(future)
+
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"Ошибка фонового запроса: {error}")
+            elif on_success:
+                on_success(future.result())
+
+        if self._live:
+            self._schedule_poll()
@@ -0,0 +1,211 @@
+"""Параллельная загрузка import_csv с учётом зависимостей между таблицами
+
+Запуск из каталога src:
+    python -m utils.import_pipeline --workers 4 --truncate
+    python -m utils.import_pipeline --resume
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import mysql.connector
+
+from utils.database import DB_CONFIG
+from utils.importer import (CSV_DIR, DEFAULT_BATCH_SIZE, TABLES, TABLES_BY_NAME,
+                            build_lookup, drop_indexes, load_table, secondary_indexes)
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parents[2] / ".import_checkpoint.json"
+
+
+def dependency_levels(specs):
+    """Уровни графа зависимостей: таблицы одного уровня независимы друг от друга"""
+    selected = {spec.table: spec for spec in specs}
+    # Зависимости вне выбранного набора считаются уже загруженными
+    remaining = {table: {d for d in spec.depends_on if d in selected} for table, spec in selected.items()}
+
+    levels = []
+    while remaining:
+        ready = sorted(table for table, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f"Циклическая зависимость между таблицами: {', '.join(sorted(remaining))}")
+        levels.append([selected[table] for table in ready])
+        for table in ready:
+            del remaining[table]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels
+
+
+class Checkpoint:
+    """Файл с номером последней зафиксированной пачки по каждой таблице"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.state = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def table(self, table):
+        return self.state.get(table, {})
+
+    def update(self, table, **values):
+        with self._lock:
+            self.state.setdefault(table, {}).update(values)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+    def clear(self):
+        with self._lock:
+            self.state = {}
+            if self.path.exists():
+                self.path.unlink()
+
+
+class ImportPipeline:
+    """Загрузка независимых таблиц одновременно по отдельным соединениям"""
+
+    def __init__(self, connect, specs=TABLES, workers=4, batch_size=DEFAULT_BATCH_SIZE,
+                 checkpoint_path=DEFAULT_CHECKPOINT, truncate=False, csv_dir=CSV_DIR,
+                 hash_passwords=True):
+        self.connect = connect
+        self.specs = list(specs)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.truncate = truncate
+        self.csv_dir = csv_dir
+        self.hash_passwords = hash_passwords
+        self.checkpoint = Checkpoint(checkpoint_path)
+        # Таблица -> {имя: id}; заполняется сразу после загрузки таблицы
+        self.lookups = {}
+        self.referenced = {t for spec in self.specs for t in spec.references.values()}
+        dependency_levels(self.specs)  # проверка на циклы до начала загрузки
+
+    def run(self, resume=False):
+        """Загрузка всех таблиц; возвращает отчёты в порядке завершения"""
+        if not resume:
+            self.checkpoint.clear()
+
+        selected = {spec.table: spec for spec in self.specs}
+        for table in self.referenced - selected.keys():
+            self._with_connection(self._store_lookup, table)
+
+        pending = {spec.table: {d for d in spec.depends_on if d in selected} for spec in self.specs}
+        reports = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import") as pool:
+            running = {}
+            while pending or running:
+                for table in [t for t, deps in pending.items() if not deps]:
+                    del pending[table]
+                    running[pool.submit(self._load, selected[table])] = table
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        # Дожидаемся начатых таблиц, новые не запускаем
+                        wait(running)
+                        raise RuntimeError(f"Ошибка загрузки таблицы {table}: {error}. "
+                                           f"Продолжить можно с --resume") from error
+                    reports.append(future.result())
+                    for deps in pending.values():
+                        deps.discard(table)
+
+        self.checkpoint.clear()
+        return reports
+
+    def _with_connection(self, func, *args):
+        con = self.connect()
+        try:
+            return func(con, *args)
+        finally:
+            con.close()
+
+    def _store_lookup(self, con, table):
+        cur = con.cursor()
+        try:
+            self.lookups[table] = build_lookup(cur, table)
+        finally:
+            cur.close()
+
+    def _load(self, spec):
+        return self._with_connection(self._load_on, spec)
+
+    def _load_on(self, con, spec):
+        state = self.checkpoint.table(spec.table)
+        if state.get("done"):
+            report = state["report"]
+        else:
+            indexes = state.get("indexes")
+            if indexes is None:
+                # Снимаем индексы и сразу запоминаем их, чтобы вернуть после сбоя
+                cur = con.cursor()
+                if self.truncate:
+                    # На родительские таблицы (страны, город, роли) ссылаются внешние
+                    # ключи: без отключения проверок TRUNCATE для них запрещён.
+                    # load_table снова включает проверки после загрузки
+                    cur.execute("SET foreign_key_checks = 0")
+                    cur.execute(f"TRUNCATE TABLE `{spec.table}`")
+                indexes = secondary_indexes(cur, spec.table)
+                drop_indexes(cur, spec.table, indexes)
+                cur.close()
+                # Закрываем неявную транзакцию SELECT из secondary_indexes
+                con.commit()
+                self.checkpoint.update(spec.table, indexes=indexes, batches=0)
+
+            report = load_table(
+                con, spec,
+                batch_size=self.batch_size,
+                csv_dir=self.csv_dir,
+                lookups={t: self.lookups[t] for t in set(spec.references.values())},
+                start_batch=state.get("batches", 0),
+                on_batch=lambda number: self.checkpoint.update(spec.table, batches=number),
+                indexes=indexes,
+                hash_passwords=self.hash_passwords,
+            )
+            self.checkpoint.update(spec.table, done=True, report=report)
+
+        if spec.table in self.referenced:
+            self._store_lookup(con, spec.table)
+        print(f"{report['table']:20} {report['rows']:8} строк  {report['seconds']:7.3f} c  "
+              f"{report['rows_per_sec']:10.0f} строк/с")
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Параллельная загрузка import_csv")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES_BY_NAME), help="только эти таблицы")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--truncate", action="store_true", help="очистить таблицы перед загрузкой")
+    parser.add_argument("--resume", action="store_true", help="продолжить с последней зафиксированной пачки")
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT))
+    parser.add_argument("--csv-dir", default=str(CSV_DIR))
+    parser.add_argument("--plain-passwords", action="store_true", help="не хешировать пароли")
+    args = parser.parse_args()
+
+    specs = [TABLES_BY_NAME[t] for t in args.tables] if args.tables else TABLES
+    for number, level in enumerate(dependency_levels(specs), start=1):
+        print(f"Уровень {number}: {', '.join(spec.table for spec in level)}")
+
+    pipeline = ImportPipeline(lambda: mysql.connector.connect(**DB_CONFIG), specs,
+                              workers=args.workers, batch_size=args.batch_size,
+                              checkpoint_path=args.checkpoint, truncate=args.truncate,
+                              csv_dir=args.csv_dir, hash_passwords=not args.plain_passwords)
+    start = time.perf_counter()
+    reports = pipeline.run(resume=args.resume)
+    total = sum(r["rows"] for r in reports)
+    elapsed = time.perf_counter() - start
+    print(f"Итого: {total} строк за {elapsed:.3f} c ({total / elapsed:.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
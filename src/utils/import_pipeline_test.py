@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+import utils.importer
+from utils.import_pipeline import Checkpoint, ImportPipeline, dependency_levels
+from utils.importer import TableSpec
+
+USERS = TableSpec('жюри', 'users.csv', {'почта': 'почта', 'пароль': 'пароль'}, password_column='пароль')
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    lines = ["почта;пароль"] + [f"user{n}@example.com;secret{n}" for n in range(1, 6)]
+    (tmp_path / "users.csv").write_text("\n".join(lines) + "\n", encoding="cp1251")
+    return tmp_path
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Пароли, прошедшие через hash_password"""
+    calls = []
+
+    def fake_hash(password):
+        calls.append(password)
+        return f"hash:{password}"
+
+    monkeypatch.setattr(utils.importer, "hash_password", fake_hash)
+    return calls
+
+
+def test_dependency_levels_orders_tables():
+    a = TableSpec('a', 'a.csv', {})
+    b = TableSpec('b', 'b.csv', {}, depends_on=['a'])
+    c = TableSpec('c', 'c.csv', {}, depends_on=['a', 'x'])
+    assert [[s.table for s in level] for level in dependency_levels([c, b, a])] == [['a'], ['b', 'c']]
+
+
+def test_dependency_levels_rejects_cycles():
+    a = TableSpec('a', 'a.csv', {}, depends_on=['b'])
+    b = TableSpec('b', 'b.csv', {}, depends_on=['a'])
+    with pytest.raises(ValueError):
+        dependency_levels([a, b])
+
+
+def test_checkpoint_persists_between_instances(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    Checkpoint(path).update('жюри', indexes=[], batches=2)
+    assert Checkpoint(path).table('жюри') == {'indexes': [], 'batches': 2}
+    Checkpoint(path).clear()
+    assert not path.exists()
+
+
+def test_pipeline_records_batches_and_clears_checkpoint(tmp_path, csv_dir, fake_connection, hashed):
+    path = tmp_path / "checkpoint.json"
+    pipeline = ImportPipeline(lambda: fake_connection, [USERS], batch_size=2,
+                              checkpoint_path=path, csv_dir=csv_dir)
+    reports = pipeline.run()
+    assert reports[0]["rows"] == 5
+    assert len(hashed) == 5
+    assert not path.exists()
+
+
+def test_resume_skips_loaded_batches_before_hashing(tmp_path, csv_dir, fake_connection, hashed):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({'жюри': {'indexes': [], 'batches': 2}}), encoding="utf-8")
+    pipeline = ImportPipeline(lambda: fake_connection, [USERS], batch_size=2,
+                              checkpoint_path=path, csv_dir=csv_dir)
+    pipeline.run(resume=True)
+    assert hashed == ["secret5"]
+    assert fake_connection.rows == [("user5@example.com", "hash:secret5")]
+
+
+def test_plain_passwords_are_not_hashed(tmp_path, csv_dir, fake_connection, hashed):
+    pipeline = ImportPipeline(lambda: fake_connection, [USERS], checkpoint_path=tmp_path / "checkpoint.json",
+                              csv_dir=csv_dir, hash_passwords=False)
+    pipeline.run()
+    assert hashed == []
+    assert fake_connection.rows[0] == ("user1@example.com", "secret1")
@@ -0,0 +1,397 @@
+"""Массовая загрузка import_csv в базу данных
+
+Запуск из каталога src:
+    python -m utils.importer --truncate
+    python -m utils.importer --tables город участники --batch-size 10000
+    python -m utils.importer --method load_data
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+import mysql.connector
+
+from utils.database import DB_CONFIG
+from utils.event_index import parse_date
+from utils.passwords import hash_password
+
+CSV_DIR = Path(__file__).resolve().parents[2] / "import_csv"
+ENCODING = "cp1251"
+DELIMITER = ";"
+DEFAULT_BATCH_SIZE = 5000
+
+
+class TableSpec:
+    """Описание соответствия файла CSV и таблицы"""
+
+    def __init__(self, table, filename, columns, fieldnames=None, transform=None,
+                 depends_on=(), references=None, password_column=None, date_columns=()):
+        self.table = table
+        self.filename = filename
+        # Заголовок CSV -> столбец таблицы, в порядке вставки
+        self.columns = columns
+        # Для файлов без строки заголовка
+        self.fieldnames = fieldnames
+        # Преобразование потока строк (например, для иерархических файлов)
+        self.transform = transform
+        # Таблицы, которые должны быть загружены раньше этой
+        self.depends_on = tuple(depends_on)
+        # Столбец -> таблица, в которой имя из CSV заменяется на id
+        self.references = references or {}
+        # Столбец с паролем: в базу пишется хеш
+        self.password_column = password_column
+        # Столбцы с датами: «3 апреля 2022 г.» и ДД.ММ.ГГГГ пишутся как ГГГГ-ММ-ДД
+        self.date_columns = tuple(date_columns)
+
+    @property
+    def db_columns(self):
+        """Столбцы таблицы без повторов (разные заголовки могут вести в один столбец)"""
+        return list(dict.fromkeys(self.columns.values()))
+
+
+def activity_rows(rows):
+    """Активности: строка мероприятия, затем строки его активностей"""
+    event = None
+    for row in rows:
+        if row.get('№'):
+            event = row
+            continue
+        if event is None or not row.get('Активность'):
+            continue
+        for key in ('№', 'Наименование мероприятия', 'Дата начала', 'Дни', 'Победитель'):
+            row[key] = event.get(key)
+        yield row
+
+
+USER_COLUMNS = {
+    'ФИО': 'имя',
+    'пол': 'пол',
+    'почта': 'почта',
+    'дата рождения': 'дата_рождения',
+    'страна': 'страна',
+    'телефон': 'телефон',
+    'пароль': 'пароль',
+    'фото': 'фото',
+}
+
+# Порядок соответствует зависимостям: страны и города раньше мероприятий
+TABLES = [
+    TableSpec('страны', 'Cтраны_import.csv', {
+        'Название страны': 'название',
+        'Английское название': 'английское_название',
+        'Код': 'код',
+        'Код2': 'код2',
+    }),
+    TableSpec('город', 'Город_import.csv', {
+        'id': 'id',
+        'название': 'название',
+    }, fieldnames=['id', 'регион', 'название'], depends_on=['страны']),
+    TableSpec('мероприятия_it', 'Мероприятия_IT-инфраструктура.csv', {
+        '№': '№',
+        'Событие': 'Событие',
+        'DATE': 'DATE',
+        'DAYS': 'DAYS',
+        'Город': 'Город',
+    }, depends_on=['город'], date_columns=['DATE']),
+    TableSpec('модераторы', 'Модераторы.csv', {
+        **USER_COLUMNS,
+        'направление': 'направление',
+        'мероприятие': 'мероприятие',
+    }, depends_on=['страны'], password_column='пароль', date_columns=['дата_рождения']),
+    TableSpec('жюри', 'жюри.csv', {
+        **USER_COLUMNS,
+        'направление': 'направление',
+    }, depends_on=['страны'], password_column='пароль', date_columns=['дата_рождения']),
+    TableSpec('организаторы', 'организаторы.csv', {
+        **USER_COLUMNS,
+        'Почта': 'почта',
+        'Дата рождения': 'дата_рождения',
+    }, depends_on=['страны'], password_column='пароль', date_columns=['дата_рождения']),
+    TableSpec('участники', 'участники.csv', {
+        **USER_COLUMNS,
+        'Почта': 'почта',
+    }, depends_on=['страны'], password_column='пароль', date_columns=['дата_рождения']),
+    TableSpec('активности', 'Активности_import.csv', {
+        '№': 'мероприятие',
+        'Наименование мероприятия': 'наименование_мероприятия',
+        'Дата начала': 'дата_начала',
+        'Дни': 'дни',
+        'Активность': 'активность',
+        'День': 'день',
+        'Время начала': 'время_начала',
+        'Модератор': 'модератор_id',
+        'Жюри 1': 'жюри_1_id',
+        'Жюри 2': 'жюри_2_id',
+        'Жюри 3': 'жюри_3_id',
+        'Жюри 4': 'жюри_4_id',
+        'Жюри 5': 'жюри_5_id',
+        'Победитель': 'победитель_id',
+    }, transform=activity_rows, depends_on=['город', 'модераторы', 'жюри', 'участники'],
+       date_columns=['дата_начала'], references={
+        'модератор_id': 'модераторы',
+        'жюри_1_id': 'жюри',
+        'жюри_2_id': 'жюри',
+        'жюри_3_id': 'жюри',
+        'жюри_4_id': 'жюри',
+        'жюри_5_id': 'жюри',
+        'победитель_id': 'участники',
+    }),
+]
+
+TABLES_BY_NAME = {spec.table: spec for spec in TABLES}
+
+
+def build_lookup(cur, table):
+    """Словарь имя -> id для замены ссылок по имени без подзапросов на строку"""
+    cur.execute(f"SELECT id, имя FROM `{table}`")
+    return {name: row_id for row_id, name in cur.fetchall()}
+
+
+def build_lookups(con, spec):
+    """Словари для всех таблиц, на которые ссылается spec"""
+    cur = con.cursor()
+    try:
+        return {table: build_lookup(cur, table) for table in set(spec.references.values())}
+    finally:
+        cur.close()
+
+
+def read_rows(spec, csv_dir=CSV_DIR, lookups=None, hash_passwords=True, skip=0):
+    """Потоковое чтение файла в кортежи значений столбцов таблицы
+
+    Первые skip строк (уже загруженные пачки) пропускаются до хеширования
+    пароля — самой дорогой части чтения.
+    """
+    with open(Path(csv_dir) / spec.filename, encoding=ENCODING, newline="") as f:
+        rows = csv.DictReader(f, fieldnames=spec.fieldnames, delimiter=DELIMITER)
+        if spec.transform:
+            rows = spec.transform(rows)
+
+        # Несколько заголовков файла могут вести в один столбец (почта/Почта)
+        sources = {}
+        for header, column in spec.columns.items():
+            sources.setdefault(column, []).append(header)
+
+        password_index = (spec.db_columns.index(spec.password_column)
+                          if hash_passwords and spec.password_column else None)
+        # Строки с нераспознанной датой: о них сообщаем после чтения файла
+        bad_dates = []
+        skipped = 0
+        for row in rows:
+            values = []
+            bad_date = None
+            for column in spec.db_columns:
+                value = next((row[h] for h in sources[column] if row.get(h)), None)
+                value = value.strip() if isinstance(value, str) and value.strip() else None
+                if value is not None and column in spec.references:
+                    value = lookups[spec.references[column]].get(value)
+                elif value is not None and column in spec.date_columns:
+                    parsed = parse_date(value)
+                    if parsed is None:
+                        bad_date = f"{column}={value!r}"
+                    value = parsed
+                values.append(value)
+            if bad_date:
+                bad_dates.append(bad_date)
+            if not any(v is not None for v in values):
+                continue
+            if skipped < skip:
+                skipped += 1
+                continue
+            if password_index is not None and values[password_index] is not None:
+                values[password_index] = hash_password(values[password_index])
+            yield tuple(values)
+
+        if bad_dates:
+            raise ValueError(f"{spec.filename}: нераспознанные даты в {len(bad_dates)} строках "
+                             f"({', '.join(bad_dates[:5])}{', ...' if len(bad_dates) > 5 else ''})")
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def secondary_indexes(cur, table):
+    """Вторичные индексы таблицы: [(имя, уникальный, [столбцы])]
+
+    Индексы под внешними ключами не трогаем: MySQL не даёт их удалить.
+    """
+    cur.execute("""SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+                   FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+                     AND INDEX_NAME NOT IN (
+                         SELECT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE
+                         WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                           AND REFERENCED_TABLE_NAME IS NOT NULL)
+                   ORDER BY INDEX_NAME, SEQ_IN_INDEX""", (table, table))
+    indexes = {}
+    for name, non_unique, column in cur.fetchall():
+        indexes.setdefault(name, (name, not non_unique, []))[2].append(column)
+    return list(indexes.values())
+
+
+def drop_indexes(cur, table, indexes):
+    for name, _, _ in indexes:
+        cur.execute(f"ALTER TABLE `{table}` DROP INDEX `{name}`")
+
+
+def rebuild_indexes(cur, table, indexes):
+    """Пересоздание индексов одним ALTER TABLE после загрузки"""
+    if not indexes:
+        return
+    parts = []
+    for name, unique, columns in indexes:
+        cols = ", ".join(f"`{c}`" for c in columns)
+        parts.append(f"ADD {'UNIQUE ' if unique else ''}INDEX `{name}` ({cols})")
+    cur.execute(f"ALTER TABLE `{table}` " + ", ".join(parts))
+
+
+def insert_batches(cur, spec, rows, batch_size, start_batch=0, on_batch=None):
+    """Вставка пачками через executemany (многострочный INSERT)
+
+    После каждой пачки вызывается on_batch(номер). rows начинаются после
+    первых start_batch пачек (read_rows(skip=...)), номера продолжают их.
+    """
+    columns = ", ".join(f"`{c}`" for c in spec.db_columns)
+    placeholders = ", ".join(["%s"] * len(spec.db_columns))
+    query = f"INSERT INTO `{spec.table}` ({columns}) VALUES ({placeholders})"
+    count = 0
+    for number, batch in enumerate(batched(rows, batch_size), start=start_batch + 1):
+        cur.executemany(query, batch)
+        count += len(batch)
+        if on_batch:
+            on_batch(number)
+    return count
+
+
+def tsv_field(value):
+    """Значение поля для LOAD DATA: NULL как \\N, спецсимволы через обратную косую черту"""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def load_data_infile(cur, spec, rows):
+    """Вставка через LOAD DATA LOCAL INFILE из временного файла в UTF-8"""
+    columns = spec.db_columns
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for row in rows:
+                f.write("\t".join(tsv_field(v) for v in row) + "\n")
+                count += 1
+        cols = ", ".join(f"`{c}`" for c in columns)
+        cur.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE `{spec.table}` "
+                    f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({cols})",
+                    (path,))
+    finally:
+        os.remove(path)
+    return count
+
+
+def load_table(con, spec, batch_size=DEFAULT_BATCH_SIZE, method="executemany",
+               truncate=False, csv_dir=CSV_DIR, lookups=None,
+               start_batch=0, on_batch=None, indexes=None, hash_passwords=True):
+    """Загрузка одной таблицы; возвращает отчёт
+
+    По умолчанию вся таблица грузится одной транзакцией. С on_batch каждая
+    пачка фиксируется отдельно, что позволяет продолжить загрузку с
+    start_batch. indexes — уже снятые индексы (при продолжении загрузки).
+    """
+    start = time.perf_counter()
+    if spec.references and lookups is None:
+        lookups = build_lookups(con, spec)
+
+    cur = con.cursor()
+    cur.execute("SET foreign_key_checks = 0, unique_checks = 0")
+    if truncate:
+        cur.execute(f"TRUNCATE TABLE `{spec.table}`")
+
+    if indexes is None:
+        indexes = secondary_indexes(cur, spec.table)
+        drop_indexes(cur, spec.table, indexes)
+
+    def committed(number):
+        con.commit()
+        on_batch(number)
+
+    completed = False
+    try:
+        # SELECT из build_lookups и secondary_indexes уже открыли неявную
+        # транзакцию, а start_transaction внутри неё запрещён
+        con.commit()
+        con.start_transaction()
+        rows = read_rows(spec, csv_dir, lookups, hash_passwords, skip=start_batch * batch_size)
+        if method == "load_data":
+            count = load_data_infile(cur, spec, rows)
+        else:
+            count = insert_batches(cur, spec, rows, batch_size, start_batch,
+                                   committed if on_batch else None)
+        con.commit()
+        completed = True
+    except BaseException:
+        # Любая ошибка (в том числе чтения CSV): откат до ALTER TABLE в finally,
+        # который иначе неявно зафиксировал бы уже вставленные пачки
+        con.rollback()
+        raise
+    finally:
+        # При прерванной пакетной загрузке индексы вернёт продолжение
+        if completed or on_batch is None:
+            rebuild_indexes(cur, spec.table, indexes)
+        cur.execute("SET foreign_key_checks = 1, unique_checks = 1")
+        cur.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "table": spec.table,
+        "rows": count,
+        "seconds": elapsed,
+        "rows_per_sec": count / elapsed if elapsed else 0.0,
+    }
+
+
+def import_all(con, specs=TABLES, **kwargs):
+    """Последовательная загрузка таблиц в порядке зависимостей"""
+    reports = []
+    for spec in specs:
+        report = load_table(con, spec, **kwargs)
+        print(f"{report['table']:20} {report['rows']:8} строк  {report['seconds']:7.3f} c  "
+              f"{report['rows_per_sec']:10.0f} строк/с")
+        reports.append(report)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка import_csv в базу данных")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES_BY_NAME), help="только эти таблицы")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--method", choices=["executemany", "load_data"], default="executemany")
+    parser.add_argument("--truncate", action="store_true", help="очистить таблицы перед загрузкой")
+    parser.add_argument("--csv-dir", default=str(CSV_DIR))
+    parser.add_argument("--plain-passwords", action="store_true", help="не хешировать пароли")
+    args = parser.parse_args()
+
+    specs = [TABLES_BY_NAME[t] for t in args.tables] if args.tables else TABLES
+    con = mysql.connector.connect(**DB_CONFIG, allow_local_infile=args.method == "load_data")
+    try:
+        start = time.perf_counter()
+        reports = import_all(con, specs, batch_size=args.batch_size, method=args.method,
+                             truncate=args.truncate, csv_dir=args.csv_dir,
+                             hash_passwords=not args.plain_passwords)
+        total = sum(r["rows"] for r in reports)
+        elapsed = time.perf_counter() - start
+        print(f"Итого: {total} строк за {elapsed:.3f} c ({total / elapsed:.0f} строк/с)")
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import pytest
+
+from utils.importer import TableSpec, load_table, read_rows, tsv_field
+
+EVENTS = TableSpec('мероприятия_it', 'events.csv', {
+    '№': '№',
+    'Событие': 'Событие',
+    'DATE': 'DATE',
+}, date_columns=['DATE'])
+
+
+def write_csv(directory, lines, name='events.csv'):
+    (directory / name).write_text("\n".join(lines) + "\n", encoding="cp1251")
+    return directory
+
+
+def test_read_rows_converts_dates(tmp_path):
+    csv_dir = write_csv(tmp_path, ["№;Событие;DATE", "1;Форум;3 апреля 2022 г.", "2;Митап;05.06.2023"])
+    assert list(read_rows(EVENTS, csv_dir)) == [('1', 'Форум', '2022-04-03'), ('2', 'Митап', '2023-06-05')]
+
+
+def test_read_rows_reports_unparsed_dates(tmp_path):
+    csv_dir = write_csv(tmp_path, ["№;Событие;DATE", "1;Форум;скоро", "2;Митап;05.06.2023", "3;Хакатон;32.13.2023"])
+    with pytest.raises(ValueError, match="в 2 строках"):
+        list(read_rows(EVENTS, csv_dir))
+
+
+def test_tsv_field_escapes_special_characters():
+    assert tsv_field(None) == "\\N"
+    assert tsv_field(42) == "42"
+    assert tsv_field("a\tb\nc\rd\\e") == "a\\tb\\nc\\rd\\\\e"
+
+
+def test_load_table_starts_transaction_after_implicit_one(tmp_path, fake_connection):
+    csv_dir = write_csv(tmp_path, ["№;Событие;DATE", "1;Форум;05.06.2023"])
+    con = fake_connection
+    report = load_table(con, EVENTS, csv_dir=csv_dir)
+    assert report["rows"] == 1
+    assert con.rows == [('1', 'Форум', '2023-06-05')]
+    assert not con.in_transaction
+
+
+def test_load_table_rolls_back_on_bad_dates(tmp_path, fake_connection):
+    csv_dir = write_csv(tmp_path, ["№;Событие;DATE", "1;Форум;скоро"])
+    con = fake_connection
+    with pytest.raises(ValueError):
+        load_table(con, EVENTS, csv_dir=csv_dir)
+    assert not con.in_transaction
+    assert con.queries[-1] == "SET foreign_key_checks = 1, unique_checks = 1"
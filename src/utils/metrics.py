@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# Верхние границы корзин гистограммы задержек, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize(query):
+    """Текст запроса в одну строку — ключ статистики"""
+    return _SPACES_RE.sub(" ", query).strip()
+
+
+def row_size(row):
+    """Примерный объём строки результата в байтах"""
+    values = row.values() if isinstance(row, dict) else row
+    size = 0
+    for value in values:
+        if isinstance(value, (bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, str):
+            size += len(value.encode())
+        elif value is not None:
+            size += 8
+    return size
+
+
+class StatementStats:
+    """Счётчики одного запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.bytes = 0
+        # Последняя корзина — всё, что дольше LATENCY_BUCKETS[-1]
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.last_error = None
+
+    def add(self, seconds, rows, nbytes, error=None):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.bytes += nbytes
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                     len(LATENCY_BUCKETS))
+        self.buckets[index] += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def quantile(self, q):
+        """Оценка квантиля по корзинам (верхняя граница корзины)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": round(self.total, 6),
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+            "last_error": self.last_error,
+        }
+
+
+class QueryMetrics:
+    """Задержки, строки и объём результата по каждому запросу и журнал медленных запросов
+
+    Медленные запросы (дольше slow_threshold секунд) и ошибки попадают в
+    журнал последних slow_log_size записей; если задан slow_log_path, они
+    дописываются туда построчно в JSON.
+    """
+
+    def __init__(self, slow_threshold=0.2, slow_log_size=100, slow_log_path=None):
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self.slow_log = deque(maxlen=slow_log_size)
+        self._statements = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, query, seconds, rows=0, nbytes=0, error=None):
+        statement = normalize(query)
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats()
+            stats.add(seconds, rows, nbytes, error)
+
+            if seconds < self.slow_threshold and error is None:
+                return
+            entry = {
+                "time": time.time(),
+                "statement": statement,
+                "ms": round(seconds * 1000, 3),
+                "rows": rows,
+                "error": str(error) if error is not None else None,
+            }
+            self.slow_log.append(entry)
+        if self.slow_log_path:
+            try:
+                with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Не удалось записать журнал медленных запросов: {e}")
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.slow_log.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Снимок всей статистики в виде словаря"""
+        with self._lock:
+            return {
+                "started": self.started,
+                "time": time.time(),
+                "slow_threshold_ms": self.slow_threshold * 1000,
+                "statements": {statement: stats.snapshot()
+                               for statement, stats in self._statements.items()},
+                "slow_log": list(self.slow_log),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Снимок в текстовом формате Prometheus"""
+        with self._lock:
+            statements = [(statement, stats.count, stats.errors, stats.total, stats.rows,
+                           stats.bytes, list(stats.buckets))
+                          for statement, stats in self._statements.items()]
+
+        def label(statement):
+            escaped = statement.replace("\\", "\\\\").replace('"', '\\"')
+            return f'statement="{escaped}"'
+
+        lines = [
+            "# HELP db_query_duration_seconds Время выполнения запроса",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        for statement, count, _, total, _, _, buckets in statements:
+            cumulative = 0
+            for bound, bucket in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], buckets):
+                cumulative += bucket
+                lines.append(f'db_query_duration_seconds_bucket{{{label(statement)},le="{bound}"}} {cumulative}')
+            lines.append(f"db_query_duration_seconds_sum{{{label(statement)}}} {total:.6f}")
+            lines.append(f"db_query_duration_seconds_count{{{label(statement)}}} {count}")
+
+        for name, index, help_text in (("db_query_errors_total", 2, "Ошибки запроса"),
+                                       ("db_query_rows_total", 4, "Строк получено"),
+                                       ("db_query_bytes_total", 5, "Байт получено (оценка)")):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for item in statements:
+                lines.append(f"{name}{{{label(item[0])}}} {item[index]}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path, fmt="json"):
+        """Запись снимка в файл: fmt = json или prometheus"""
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,233 @@
+"""Индексы для входа, общая таблица учётных данных и сводка мероприятий для списка
+
+Запуск из каталога src:
+    python -m utils.migrations apply
+    python -m utils.migrations check
+"""
+import argparse
+import sys
+
+import mysql.connector
+
+from utils.database import (AUTH_QUERY, AUTH_ROLES, CREDENTIALS_AUTH_QUERY, CREDENTIALS_TABLE,
+                            DB_CONFIG, EVENT_SUMMARY_QUERY, EVENT_SUMMARY_TABLE)
+
+# Таблицы пользователей, в которых ищут по почте
+EMAIL_TABLES = ('модераторы', 'организаторы', 'участники', 'жюри')
+EMAIL_INDEX = 'idx_почта'
+
+# Первичный ключ (role, user_id) нужен триггерам, а индекс по почте
+# содержит и хеш: вход читается из одного индекса без обращения к строкам
+CREDENTIALS_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{CREDENTIALS_TABLE}` (
+        role VARCHAR(20) NOT NULL,
+        user_id INT NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        priority TINYINT NOT NULL,
+        hash VARCHAR(255),
+        PRIMARY KEY (role, user_id),
+        INDEX idx_credentials_email (email, priority, hash)
+    )
+"""
+
+# Типы столбцов берутся из мероприятия_it и город; индекс (DATE, №) — для
+# постраничного списка, индекс по городу — для триггеров таблицы город
+EVENT_SUMMARY_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{EVENT_SUMMARY_TABLE}` (
+        PRIMARY KEY (`№`),
+        INDEX idx_сводка_дата (DATE, `№`),
+        INDEX idx_сводка_город (Город)
+    ) AS {EVENT_SUMMARY_QUERY} WHERE FALSE
+"""
+
+# Типы доступа EXPLAIN, которые означают поиск по индексу
+INDEX_ACCESS = ('const', 'eq_ref', 'ref')
+
+
+def has_index(cur, table, index):
+    cur.execute("""SELECT 1 FROM information_schema.STATISTICS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+                   LIMIT 1""", (table, index))
+    return cur.fetchone() is not None
+
+
+def create_email_indexes(cur, tables=EMAIL_TABLES):
+    """Индекс по почте в каждой таблице пользователей
+
+    Индекс не уникальный: у части жюри и участников почта не заполнена.
+    """
+    for table in tables:
+        if has_index(cur, table, EMAIL_INDEX):
+            continue
+        cur.execute(f"CREATE INDEX `{EMAIL_INDEX}` ON `{table}` (почта)")
+        print(f"{table:15} создан индекс {EMAIL_INDEX}")
+
+
+def create_credentials(cur):
+    """Таблица credentials и триггеры, которые держат её в согласии с таблицами ролей"""
+    cur.execute(CREDENTIALS_DDL)
+    for table, (role, priority) in AUTH_ROLES.items():
+        cur.execute(f"DROP TRIGGER IF EXISTS `{table}_credentials_insert`")
+        cur.execute(f"""
+            CREATE TRIGGER `{table}_credentials_insert` AFTER INSERT ON `{table}` FOR EACH ROW
+            INSERT INTO `{CREDENTIALS_TABLE}` (role, user_id, email, priority, hash)
+            VALUES ('{role}', NEW.id, COALESCE(NEW.почта, ''), {priority}, NEW.пароль)
+            ON DUPLICATE KEY UPDATE email = VALUES(email), hash = VALUES(hash)
+        """)
+        cur.execute(f"DROP TRIGGER IF EXISTS `{table}_credentials_update`")
+        cur.execute(f"""
+            CREATE TRIGGER `{table}_credentials_update` AFTER UPDATE ON `{table}` FOR EACH ROW
+            UPDATE `{CREDENTIALS_TABLE}`
+               SET user_id = NEW.id, email = COALESCE(NEW.почта, ''), hash = NEW.пароль
+             WHERE role = '{role}' AND user_id = OLD.id
+        """)
+        cur.execute(f"DROP TRIGGER IF EXISTS `{table}_credentials_delete`")
+        cur.execute(f"""
+            CREATE TRIGGER `{table}_credentials_delete` AFTER DELETE ON `{table}` FOR EACH ROW
+            DELETE FROM `{CREDENTIALS_TABLE}` WHERE role = '{role}' AND user_id = OLD.id
+        """)
+
+
+def sync_credentials(cur):
+    """Полное заполнение credentials из таблиц ролей
+
+    Нужно после создания таблицы и после TRUNCATE, который триггеры не видят.
+    """
+    cur.execute(f"DELETE FROM `{CREDENTIALS_TABLE}`")
+    for table, (role, priority) in AUTH_ROLES.items():
+        cur.execute(f"""INSERT INTO `{CREDENTIALS_TABLE}` (role, user_id, email, priority, hash)
+                        SELECT %s, id, COALESCE(почта, ''), %s, пароль FROM `{table}`""",
+                    (role, priority))
+        print(f"{table:15} учётных записей: {cur.rowcount}")
+
+
+def create_event_summary(cur):
+    """Таблица сводки мероприятий и триггеры на мероприятия_it и город"""
+    cur.execute(EVENT_SUMMARY_DDL)
+    # Строка сводки пишется заново с названием города; REPLACE — потому что
+    # после TRUNCATE мероприятий (триггеры его не видят) в сводке остаются старые номера
+    replace = f"""
+        REPLACE INTO `{EVENT_SUMMARY_TABLE}` (`№`, Событие, DATE, DAYS, Город, город_название)
+        VALUES (NEW.`№`, NEW.Событие, NEW.DATE, NEW.DAYS, NEW.Город,
+                (SELECT название FROM город WHERE id = NEW.Город))
+    """
+    cur.execute("DROP TRIGGER IF EXISTS `мероприятия_it_сводка_insert`")
+    cur.execute(f"""
+        CREATE TRIGGER `мероприятия_it_сводка_insert` AFTER INSERT ON мероприятия_it FOR EACH ROW
+        {replace}
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS `мероприятия_it_сводка_update`")
+    cur.execute(f"""
+        CREATE TRIGGER `мероприятия_it_сводка_update` AFTER UPDATE ON мероприятия_it FOR EACH ROW
+        BEGIN
+            DELETE FROM `{EVENT_SUMMARY_TABLE}` WHERE `№` = OLD.`№`;
+            {replace};
+        END
+    """)
+    cur.execute("DROP TRIGGER IF EXISTS `мероприятия_it_сводка_delete`")
+    cur.execute(f"""
+        CREATE TRIGGER `мероприятия_it_сводка_delete` AFTER DELETE ON мероприятия_it FOR EACH ROW
+        DELETE FROM `{EVENT_SUMMARY_TABLE}` WHERE `№` = OLD.`№`
+    """)
+    # Название города меняется во всех мероприятиях этого города
+    for action in ("insert", "update"):
+        old_id = "OLD.id" if action == "update" else "NEW.id"
+        cur.execute(f"DROP TRIGGER IF EXISTS `город_сводка_{action}`")
+        cur.execute(f"""
+            CREATE TRIGGER `город_сводка_{action}` AFTER {action.upper()} ON город FOR EACH ROW
+            UPDATE `{EVENT_SUMMARY_TABLE}`
+               SET город_название = CASE WHEN Город = NEW.id THEN NEW.название END
+             WHERE Город IN ({old_id}, NEW.id)
+        """)
+    cur.execute("DROP TRIGGER IF EXISTS `город_сводка_delete`")
+    cur.execute(f"""
+        CREATE TRIGGER `город_сводка_delete` AFTER DELETE ON город FOR EACH ROW
+        UPDATE `{EVENT_SUMMARY_TABLE}` SET город_название = NULL WHERE Город = OLD.id
+    """)
+
+
+def sync_event_summary(cur):
+    """Полное заполнение сводки; нужно после создания и после TRUNCATE мероприятий"""
+    cur.execute(f"DELETE FROM `{EVENT_SUMMARY_TABLE}`")
+    cur.execute(f"""INSERT INTO `{EVENT_SUMMARY_TABLE}` (`№`, Событие, DATE, DAYS, Город, город_название)
+                    {EVENT_SUMMARY_QUERY}""")
+    print(f"{EVENT_SUMMARY_TABLE:15} мероприятий: {cur.rowcount}")
+
+
+def apply(con):
+    cur = con.cursor()
+    try:
+        create_email_indexes(cur)
+        create_credentials(cur)
+        sync_credentials(cur)
+        create_event_summary(cur)
+        sync_event_summary(cur)
+        con.commit()
+    finally:
+        cur.close()
+
+
+def explain_login(con, email="check@example.com"):
+    """План запроса входа: список строк EXPLAIN"""
+    cur = con.cursor(dictionary=True)
+    try:
+        cur.execute("EXPLAIN " + CREDENTIALS_AUTH_QUERY, (email,))
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def full_scans(plan):
+    """Строки плана, которые читают таблицу целиком или без индекса"""
+    return [row for row in plan
+            if row.get('table') is not None
+            and (row.get('type') not in INDEX_ACCESS or row.get('key') is None)]
+
+
+def explain_login_sqlite(con, email="check@example.com"):
+    """План запроса входа во встроенном хранилище: строки EXPLAIN QUERY PLAN
+
+    В файле SQLite нет таблицы credentials, вход идёт запросом AUTH_QUERY.
+    """
+    cur = con.cursor(dictionary=True)
+    try:
+        cur.execute("EXPLAIN QUERY PLAN " + AUTH_QUERY, (email,) * 3)
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def sqlite_full_scans(plan):
+    """Строки EXPLAIN QUERY PLAN с просмотром таблицы или индекса целиком (SCAN)"""
+    return [row for row in plan if row['detail'].startswith('SCAN ')]
+
+
+def check(con):
+    """Проверка, что вход — поиск по индексу, а не полный просмотр таблиц"""
+    plan = explain_login(con)
+    for row in plan:
+        print(f"{row['table']!s:15} type={row['type']!s:7} key={row['key']!s:25} "
+              f"rows={row['rows']!s:6} {row.get('Extra') or ''}")
+    scans = full_scans(plan)
+    for row in scans:
+        print(f"Полный просмотр таблицы {row['table']}: type={row['type']}, key={row['key']}")
+    return not scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["apply", "check"])
+    args = parser.parse_args()
+
+    con = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.command == "apply":
+            apply(con)
+        elif not check(con):
+            sys.exit(1)
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
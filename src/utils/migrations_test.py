@@ -0,0 +1,87 @@
+import mysql.connector
+import pytest
+from mysql.connector import Error
+
+from utils.database import CREDENTIALS_TABLE, DB_CONFIG
+from utils.database.sqlite import SQLiteConnection
+from utils.migrations import explain_login, explain_login_sqlite, full_scans, has_index, sqlite_full_scans
+
+
+def plan_row(table, type_, key, rows=1):
+    return {'id': 1, 'select_type': 'SIMPLE', 'table': table, 'type': type_,
+            'key': key, 'rows': rows, 'Extra': None}
+
+
+def test_full_scans_accepts_index_lookups():
+    plan = [
+        plan_row('c', 'ref', 'idx_credentials_email'),
+        plan_row('m', 'eq_ref', 'PRIMARY'),
+        plan_row('o', 'eq_ref', 'PRIMARY'),
+        plan_row('u', 'const', 'PRIMARY'),
+    ]
+    assert full_scans(plan) == []
+
+
+def test_full_scans_reports_table_scan():
+    scan = plan_row('c', 'ALL', None, rows=100000)
+    assert full_scans([plan_row('m', 'eq_ref', 'PRIMARY'), scan]) == [scan]
+
+
+def test_full_scans_reports_index_scan_and_missing_key():
+    index_scan = plan_row('c', 'index', 'idx_credentials_email')
+    no_key = plan_row('u', 'ref', None)
+    assert full_scans([index_scan, no_key]) == [index_scan, no_key]
+
+
+def test_full_scans_ignores_rows_without_table():
+    # Строка UNION RESULT и «Impossible WHERE» не относятся к таблицам
+    assert full_scans([plan_row(None, None, None), plan_row('c', 'ref', 'idx_credentials_email')]) == []
+
+
+@pytest.fixture(scope="module")
+def mysql_connection():
+    try:
+        con = mysql.connector.connect(**DB_CONFIG, connection_timeout=3)
+    except Error as e:
+        pytest.skip(f"MySQL недоступен: {e}")
+    yield con
+    con.close()
+
+
+def test_login_plan_has_no_full_scans(mysql_connection):
+    cur = mysql_connection.cursor()
+    try:
+        if not has_index(cur, CREDENTIALS_TABLE, 'idx_credentials_email'):
+            pytest.skip("Нет таблицы credentials: выполните python -m utils.migrations apply")
+    finally:
+        cur.close()
+    assert full_scans(explain_login(mysql_connection)) == []
+
+
+def test_sqlite_full_scans_reports_scan_rows():
+    plan = [{'detail': 'SEARCH участники USING INDEX idx_участники_почта (почта=?)'},
+            {'detail': 'USE TEMP B-TREE FOR ORDER BY'},
+            {'detail': 'SCAN модераторы'},
+            {'detail': 'SCAN жюри USING COVERING INDEX idx_жюри_почта'}]
+    assert sqlite_full_scans(plan) == plan[2:]
+
+
+@pytest.fixture
+def sqlite_connection(sqlite_path):
+    con = SQLiteConnection(sqlite_path)
+    yield con
+    con.close()
+
+
+def test_sqlite_login_plan_has_no_full_scans(sqlite_connection):
+    plan = explain_login_sqlite(sqlite_connection)
+    assert [row for row in plan if row['detail'].startswith('SEARCH ')]
+    assert sqlite_full_scans(plan) == []
+
+
+def test_sqlite_login_plan_detects_missing_index(sqlite_connection):
+    cur = sqlite_connection.cursor()
+    cur.execute("DROP INDEX idx_участники_почта")
+    cur.close()
+    assert [row['detail'] for row in sqlite_full_scans(explain_login_sqlite(sqlite_connection))] == [
+        'SCAN участники']
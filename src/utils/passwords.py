@@ -0,0 +1,165 @@
+"""Хеширование паролей (scrypt) и перевод существующих записей на хеши
+
+Запуск из каталога src:
+    python -m utils.passwords migrate
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from utils.cache import TTLCache
+
+PREFIX = "scrypt"
+# Параметры по умолчанию: ~50 мс на проверку на одном ядре
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+# Таблицы с паролями пользователей
+PASSWORD_TABLES = ('модераторы', 'организаторы', 'участники', 'жюри')
+# Длина столбца пароля, в которую хеш помещается с запасом
+HASH_COLUMN_LENGTH = 255
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.startswith(PREFIX + "$")
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Строка вида scrypt$n$r$p$соль$ключ"""
+    salt = os.urandom(SALT_SIZE)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                         maxmem=2 * 128 * n * r + 1024 * 1024, dklen=KEY_SIZE)
+    return f"{PREFIX}${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def check_password(password, stored):
+    """Проверка пароля; незахешированные записи сравниваются как есть"""
+    if not is_hashed(stored):
+        return stored is not None and hmac.compare_digest(password.encode(), str(stored).encode())
+    _, n, r, p, salt, key = stored.split("$")
+    n, r, p = int(n), int(r), int(p)
+    expected = base64.b64decode(key)
+    actual = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=n, r=r, p=p,
+                            maxmem=2 * 128 * n * r + 1024 * 1024, dklen=len(expected))
+    return hmac.compare_digest(actual, expected)
+
+
+class PasswordHasher:
+    """Проверка паролей в отдельном пуле потоков с кэшем успешных проверок
+
+    Кэш хранит не пароли, а HMAC от (хеш, пароль) с ключом процесса, и
+    записи живут недолго: повторный вход не платит за KDF, а смена пароля
+    сразу делает запись бесполезной.
+    """
+
+    def __init__(self, workers=None, cache_size=256, cache_ttl=60):
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2,
+                                        thread_name_prefix="kdf")
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._secret = os.urandom(32)
+
+    def verify(self, password, stored):
+        if not is_hashed(stored):
+            return check_password(password, stored)
+
+        key = hmac.new(self._secret, f"{stored}\0{password}".encode(), hashlib.sha256).digest()
+        if self._cache.get(key):
+            return True
+        ok = self._pool.submit(check_password, password, stored).result()
+        if ok:
+            self._cache.set(key, True)
+        return ok
+
+    def cache_stats(self):
+        return self._cache.stats()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def widen_password_column(cur, table, length=HASH_COLUMN_LENGTH):
+    """Расширение столбца пароля под хеш, только если он короче length
+
+    Определение столбца читается из information_schema: NOT NULL,
+    значение по умолчанию, кодировка, сравнение и комментарий сохраняются.
+    """
+    cur.execute("""SELECT DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, IS_NULLABLE, COLUMN_DEFAULT,
+                          CHARACTER_SET_NAME, COLLATION_NAME, COLUMN_COMMENT
+                   FROM information_schema.COLUMNS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'пароль'""",
+                (table,))
+    row = cur.fetchone()
+    if row is None:
+        return False
+    data_type, max_length, nullable, default, charset, collation, comment = row
+    if data_type not in ('char', 'varchar') or (max_length or 0) >= length:
+        return False
+
+    definition = f"VARCHAR({length})"
+    if charset:
+        definition += f" CHARACTER SET {charset}"
+    if collation:
+        definition += f" COLLATE {collation}"
+    definition += " NOT NULL" if nullable == 'NO' else " NULL"
+    params = []
+    if default is not None:
+        definition += " DEFAULT %s"
+        params.append(default)
+    if comment:
+        definition += " COMMENT %s"
+        params.append(comment)
+    cur.execute(f"ALTER TABLE `{table}` MODIFY `пароль` {definition}", tuple(params) or None)
+    print(f"{table:15} столбец пароль: {data_type}({max_length}) -> VARCHAR({length})")
+    return True
+
+
+def migrate(con, tables=PASSWORD_TABLES, batch_size=500):
+    """Замена открытых паролей на хеши; уже захешированные строки пропускаются"""
+    cur = con.cursor()
+    try:
+        for table in tables:
+            # Хеш длиннее прежних паролей
+            widen_password_column(cur, table)
+            cur.execute(f"SELECT id, `пароль` FROM `{table}` WHERE `пароль` NOT LIKE %s",
+                        (PREFIX + "$%",))
+            rows = [(hash_password(password), row_id) for row_id, password in cur.fetchall()
+                    if password is not None]
+            for start in range(0, len(rows), batch_size):
+                cur.executemany(f"UPDATE `{table}` SET `пароль` = %s WHERE id = %s",
+                                rows[start:start + batch_size])
+                con.commit()
+            print(f"{table:15} захешировано паролей: {len(rows)}")
+    finally:
+        cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Хеширование паролей пользователей")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--tables", nargs="+", default=list(PASSWORD_TABLES))
+    args = parser.parse_args()
+
+    # utils.database сам импортирует этот модуль
+    from utils.database import DB_CONFIG
+
+    con = mysql.connector.connect(**DB_CONFIG)
+    try:
+        migrate(con, args.tables)
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
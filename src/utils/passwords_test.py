@@ -0,0 +1,103 @@
+import pytest
+
+import utils.passwords
+from utils.passwords import PasswordHasher, check_password, hash_password, is_hashed, widen_password_column
+
+# Малые параметры scrypt: проверяется формат, а не стойкость
+FAST = {"n": 2 ** 4, "r": 1, "p": 1}
+
+
+def test_hash_round_trip():
+    stored = hash_password("секрет", **FAST)
+    assert is_hashed(stored)
+    assert stored.startswith("scrypt$16$1$1$")
+    assert check_password("секрет", stored)
+    assert not check_password("другой", stored)
+
+
+def test_hashes_are_salted():
+    assert hash_password("секрет", **FAST) != hash_password("секрет", **FAST)
+
+
+def test_plain_passwords_are_compared_as_is():
+    assert not is_hashed("секрет")
+    assert check_password("секрет", "секрет")
+    assert not check_password("секрет", "Секрет")
+    assert not check_password("секрет", None)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Число вызовов KDF"""
+    calls = []
+    original = utils.passwords.check_password
+
+    def counted(password, stored):
+        calls.append(password)
+        return original(password, stored)
+
+    monkeypatch.setattr(utils.passwords, "check_password", counted)
+    return calls
+
+
+def test_verify_caches_successful_checks(hasher, checks):
+    stored = hash_password("секрет", **FAST)
+    assert hasher.verify("секрет", stored)
+    assert hasher.verify("секрет", stored)
+    assert checks == ["секрет"]
+    assert hasher.cache_stats()["hits"] == 1
+
+
+def test_verify_does_not_cache_failures(hasher, checks):
+    stored = hash_password("секрет", **FAST)
+    assert not hasher.verify("другой", stored)
+    assert not hasher.verify("другой", stored)
+    assert len(checks) == 2
+
+
+def test_verify_cache_is_bound_to_stored_hash(hasher, checks):
+    assert hasher.verify("секрет", hash_password("секрет", **FAST))
+    # Смена пароля даёт новый хеш: запись кэша к нему не подходит
+    assert hasher.verify("секрет", hash_password("секрет", **FAST))
+    assert len(checks) == 2
+
+
+class ColumnCursor:
+    """Курсор с одной строкой information_schema.COLUMNS"""
+
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchone(self):
+        return self.row
+
+
+def test_widen_password_column_keeps_definition():
+    cur = ColumnCursor(('varchar', 45, 'NO', 'x', 'utf8mb4', 'utf8mb4_0900_ai_ci', 'пароль'))
+    assert widen_password_column(cur, 'жюри')
+    query, params = cur.executed[-1]
+    assert query == ("ALTER TABLE `жюри` MODIFY `пароль` VARCHAR(255) CHARACTER SET utf8mb4 "
+                     "COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT %s COMMENT %s")
+    assert params == ('x', 'пароль')
+
+
+@pytest.mark.parametrize("row", [
+    None,
+    ('varchar', 255, 'YES', None, 'utf8mb4', 'utf8mb4_0900_ai_ci', ''),
+    ('text', None, 'YES', None, 'utf8mb4', 'utf8mb4_0900_ai_ci', ''),
+])
+def test_widen_password_column_skips_wide_enough_columns(row):
+    cur = ColumnCursor(row)
+    assert not widen_password_column(cur, 'жюри')
+    assert len(cur.executed) == 1
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """Не удалось получить соединение из пула за отведённое время"""
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений с проверкой при выдаче
+
+    Проверка (ping) стоит лишнего обращения к серверу, поэтому выполняется
+    только для соединений, простоявших дольше check_idle секунд; обрыв
+    недавно использованного соединения обрабатывает повтор в Connector._execute.
+    """
+
+    def __init__(self, factory, size=5, timeout=10.0, check_idle=30.0):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        # Пары (соединение, время возврата в пул)
+        self._idle = deque()
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "reconnects": 0,
+            "discarded": 0,
+            "timeouts": 0,
+        }
+
+    def checkout(self):
+        """Выдача живого соединения из пула"""
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Пул соединений закрыт")
+                if self._idle:
+                    con, returned = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    con = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"Нет свободных соединений (размер пула {self.size})")
+                self._stats["waits"] += 1
+                self._lock.wait(remaining)
+            self._stats["checkouts"] += 1
+
+        if con is not None and (time.monotonic() - returned < self.check_idle
+                                or self._is_alive(con)):
+            return con
+        if con is not None:
+            self._close_quietly(con)
+            with self._lock:
+                self._stats["reconnects"] += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+                self._lock.notify()
+            raise
+
+    def checkin(self, con, broken=False):
+        """Возврат соединения в пул; сломанное соединение закрывается"""
+        with self._lock:
+            if broken or self._closed:
+                self._created -= 1
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((con, time.monotonic()))
+            self._lock.notify()
+        if broken or self._closed:
+            self._close_quietly(con)
+
+    @contextmanager
+    def connection(self):
+        """Соединение на время блока with"""
+        con = self.checkout()
+        broken = False
+        try:
+            yield con
+        except Exception:
+            broken = not self._is_alive(con)
+            raise
+        finally:
+            self.checkin(con, broken=broken)
+
+    def stats(self):
+        """Текущее состояние пула"""
+        with self._lock:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                **self._stats,
+            }
+
+    def close(self):
+        """Закрытие всех свободных соединений"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._created -= len(idle)
+            self._lock.notify_all()
+        for con, _ in idle:
+            self._close_quietly(con)
+
+    @staticmethod
+    def _is_alive(con):
+        try:
+            return con.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(con):
+        try:
+            con.close()
+        except Exception:
+            pass
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+import utils.pool
+from utils.pool import ConnectionPool, PoolTimeout
+
+
+class StubConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.pings = 0
+
+    def is_connected(self):
+        self.pings += 1
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def created():
+    return []
+
+
+@pytest.fixture
+def factory(created):
+    def connect():
+        con = StubConnection(len(created) + 1)
+        created.append(con)
+        return con
+    return connect
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время time.monotonic для проверки простоя"""
+    now = [1000.0]
+    monkeypatch.setattr(utils.pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_checkin_reuses_connection(factory, created):
+    pool = ConnectionPool(factory, size=2)
+    con = pool.checkout()
+    pool.checkin(con)
+    assert pool.checkout() is con
+    assert len(created) == 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted(factory):
+    pool = ConnectionPool(factory, size=1, timeout=0.05)
+    pool.checkout()
+    with pytest.raises(PoolTimeout):
+        pool.checkout()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiting_checkout_gets_returned_connection(factory):
+    pool = ConnectionPool(factory, size=1, timeout=5)
+    con = pool.checkout()
+    threading.Timer(0.05, pool.checkin, (con,)).start()
+    assert pool.checkout() is con
+    assert pool.stats()["waits"] >= 1
+
+
+def test_recently_used_connection_is_not_pinged(factory, clock):
+    pool = ConnectionPool(factory, check_idle=30)
+    con = pool.checkout()
+    pool.checkin(con)
+    clock[0] += 5
+    assert pool.checkout() is con
+    assert con.pings == 0
+
+
+def test_idle_dead_connection_is_replaced(factory, created, clock):
+    pool = ConnectionPool(factory, check_idle=30)
+    con = pool.checkout()
+    pool.checkin(con)
+    con.alive = False
+    clock[0] += 60
+    fresh = pool.checkout()
+    assert fresh is not con
+    assert con.closed
+    assert pool.stats()["reconnects"] == 1
+    assert len(created) == 2
+
+
+def test_broken_connection_frees_its_slot(factory):
+    pool = ConnectionPool(factory, size=1, timeout=0.05)
+    con = pool.checkout()
+    pool.checkin(con, broken=True)
+    assert con.closed
+    assert pool.checkout() is not con
+    assert pool.stats()["discarded"] == 1
+
+
+def test_failed_connect_frees_its_slot(created):
+    def connect():
+        if not created:
+            created.append(None)
+            raise OSError("нет соединения")
+        return StubConnection(2)
+
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+    with pytest.raises(OSError):
+        pool.checkout()
+    assert pool.checkout().number == 2
+
+
+def test_connection_context_discards_dead_connection_on_error(factory):
+    pool = ConnectionPool(factory, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as con:
+            con.alive = False
+            raise RuntimeError("обрыв")
+    assert con.closed
+    assert pool.stats()["created"] == 0
+
+
+def test_close_closes_idle_connections(factory):
+    pool = ConnectionPool(factory, size=2)
+    con = pool.checkout()
+    pool.checkin(con)
+    pool.close()
+    assert con.closed
+    with pytest.raises(PoolTimeout):
+        pool.checkout()
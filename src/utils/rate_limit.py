@@ -0,0 +1,100 @@
+import getpass
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / ".login_limits.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS login_limits (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    locked_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+def client_key():
+    """Ключ текущего клиента (компьютер и пользователь ОС)"""
+    return f"client:{getpass.getuser()}@{socket.gethostname()}"
+
+
+def email_key(email):
+    return f"email:{email.strip().lower()}"
+
+
+class LoginRateLimiter:
+    """Ограничение неудачных попыток входа (token bucket) с хранением в SQLite
+
+    У каждого ключа (почта, клиент) есть max_attempts жетонов, которые
+    восстанавливаются за window секунд. Каждая неудача забирает жетон;
+    когда жетоны кончаются, ключ блокируется на lock_duration секунд.
+    Состояние общее для всех процессов на машине и переживает перезапуск.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_attempts=3, window=10 * 60, lock_duration=10 * 60):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lock_duration = lock_duration
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(str(path), timeout=5, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(SCHEMA)
+
+    def _state(self, key, now):
+        """Жетоны ключа с учётом восстановления и время окончания блокировки"""
+        row = self._con.execute("SELECT tokens, updated, locked_until FROM login_limits WHERE key = ?",
+                                (key,)).fetchone()
+        if row is None:
+            return float(self.max_attempts), 0.0
+        tokens, updated, locked_until = row
+        tokens = min(self.max_attempts, tokens + (now - updated) * self.max_attempts / self.window)
+        return tokens, locked_until
+
+    def locked_until(self, *keys):
+        """Время окончания блокировки (time.time()) или None"""
+        now = time.time()
+        with self._lock:
+            until = max((self._state(key, now)[1] for key in keys), default=0.0)
+        return until if until > now else None
+
+    def attempts_left(self, *keys):
+        now = time.time()
+        with self._lock:
+            return min(int(self._state(key, now)[0]) for key in keys)
+
+    def register_failure(self, *keys):
+        """Учёт неудачной попытки; возвращает (осталось попыток, заблокирован до или None)"""
+        now = time.time()
+        remaining, locked = self.max_attempts, 0.0
+        with self._lock:
+            self._con.execute("BEGIN IMMEDIATE")
+            try:
+                for key in keys:
+                    tokens, locked_until = self._state(key, now)
+                    tokens -= 1
+                    if tokens < 1:
+                        locked_until = now + self.lock_duration
+                        tokens = float(self.max_attempts)
+                        remaining = 0
+                    else:
+                        remaining = min(remaining, int(tokens))
+                    locked = max(locked, locked_until)
+                    self._con.execute("""INSERT INTO login_limits (key, tokens, updated, locked_until)
+                                         VALUES (?, ?, ?, ?)
+                                         ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens,
+                                             updated = excluded.updated, locked_until = excluded.locked_until""",
+                                      (key, tokens, now, locked_until))
+                self._con.execute("COMMIT")
+            except sqlite3.Error:
+                self._con.execute("ROLLBACK")
+                raise
+        return remaining, (locked if locked > now else None)
+
+    def reset(self, *keys):
+        """Сброс счётчиков после успешного входа"""
+        with self._lock:
+            self._con.executemany("DELETE FROM login_limits WHERE key = ?", [(key,) for key in keys])
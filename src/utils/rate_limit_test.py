@@ -0,0 +1,64 @@
+import pytest
+
+import utils.rate_limit
+from utils.rate_limit import LoginRateLimiter, email_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(utils.rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def limiter(tmp_path, clock):
+    return LoginRateLimiter(tmp_path / "limits.sqlite3", max_attempts=3, window=600, lock_duration=600)
+
+
+def test_email_key_is_case_insensitive():
+    assert email_key(" User@Example.com ") == email_key("user@example.com")
+
+
+def test_failures_use_up_attempts_and_lock(limiter, clock):
+    assert limiter.register_failure("a") == (2, None)
+    assert limiter.register_failure("a") == (1, None)
+    remaining, locked_until = limiter.register_failure("a")
+    assert remaining == 0
+    assert locked_until == clock[0] + 600
+    assert limiter.locked_until("a") == locked_until
+
+
+def test_lock_expires(limiter, clock):
+    for _ in range(3):
+        limiter.register_failure("a")
+    clock[0] += 601
+    assert limiter.locked_until("a") is None
+    assert limiter.attempts_left("a") == 3
+
+
+def test_attempts_recover_over_window(limiter, clock):
+    limiter.register_failure("a")
+    limiter.register_failure("a")
+    assert limiter.attempts_left("a") == 1
+    clock[0] += 200
+    assert limiter.attempts_left("a") == 2
+
+
+def test_any_locked_key_locks_login(limiter):
+    for _ in range(3):
+        limiter.register_failure("client", email_key("a@example.com"))
+    assert limiter.locked_until("client", email_key("b@example.com"))
+    assert limiter.locked_until(email_key("b@example.com")) is None
+
+
+def test_state_is_shared_between_instances(tmp_path, limiter):
+    limiter.register_failure("a")
+    other = LoginRateLimiter(tmp_path / "limits.sqlite3", max_attempts=3, window=600)
+    assert other.attempts_left("a") == 2
+
+
+def test_reset_forgets_failures(limiter):
+    limiter.register_failure("a")
+    limiter.reset("a")
+    assert limiter.attempts_left("a") == 3
@@ -0,0 +1,117 @@
+import json
+import os
+from pathlib import Path
+
+from mysql.connector import Error
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".schema_cache.json"
+# Меняется при изменении формата файла кэша
+CACHE_FORMAT = 2
+
+# Признаки имени таблицы с мероприятиями, если основной таблицы нет
+EVENTS_TABLE = 'мероприятия_it'
+EVENTS_TABLE_KEYWORDS = ('мероприят', 'событ', 'event')
+
+# Возможные имена столбцов для полей, которые есть не во всех схемах
+EVENT_FIELDS = {
+    'organizer': ('организатор_id', 'id_организатора'),
+    'location': ('Место', 'Локация', 'Адрес'),
+    'time': ('Время', 'Время_начала'),
+}
+
+# Отпечаток схемы по столбцам, а не по таблицам: добавленный столбец
+# (в том числе ALTER TABLE ... ADD COLUMN ... INSTANT, который не меняет
+# CREATE_TIME) меняет и число, и сумму. Сумма CRC32 не зависит от порядка
+# строк и не упирается в group_concat_max_len, как GROUP_CONCAT
+VERSION_QUERY = """
+    SELECT COUNT(*) AS columns_count,
+           SUM(CRC32(CONCAT_WS('.', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE))) AS checksum
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+COLUMNS_QUERY = """
+    SELECT TABLE_NAME AS table_name, COLUMN_NAME AS column_name
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+
+class SchemaCache:
+    """Карта таблиц и столбцов базы данных, сохраняемая на диск"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.tables = {}
+        self.loaded = False
+        self._columns = {}
+        self._resolved = {}
+
+    def load(self, execute, version_query=VERSION_QUERY, columns_query=COLUMNS_QUERY, tag="mysql"):
+        """Чтение схемы: из файла, если версия совпадает, иначе из каталога базы
+
+        Запросы каталога зависят от хранилища (см. utils.database.backends);
+        tag отличает кэш разных баз, записанный в один файл.
+        """
+        try:
+            row = execute(version_query, fetch="one")
+            version = f"{CACHE_FORMAT}:{tag}:{row['columns_count']}:{row['checksum']}"
+
+            cached = self._read_file()
+            if cached and cached.get("version") == version:
+                tables = cached["tables"]
+            else:
+                tables = {}
+                for column in execute(columns_query):
+                    tables.setdefault(column['table_name'], []).append(column['column_name'])
+                self._write_file({"version": version, "tables": tables})
+        except Error as e:
+            print(f"Ошибка при чтении схемы базы данных: {e}")
+            return self
+
+        self._set_tables(tables)
+        return self
+
+    def _set_tables(self, tables):
+        self.tables = tables
+        self._columns = {table: set(columns) for table, columns in tables.items()}
+        self._resolved = {}
+        self.loaded = True
+
+    def _read_file(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_file(self, data):
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Не удалось сохранить кэш схемы: {e}")
+
+    def has_table(self, table):
+        return table in self._columns
+
+    def events_table(self):
+        """Имя таблицы с мероприятиями или None"""
+        if 'events_table' not in self._resolved:
+            table = EVENTS_TABLE if self.has_table(EVENTS_TABLE) else None
+            if table is None:
+                table = next((name for name in self.tables
+                              if any(k in name.lower() for k in EVENTS_TABLE_KEYWORDS)), None)
+            self._resolved['events_table'] = table
+        return self._resolved['events_table']
+
+    def column(self, table, aliases):
+        """Первое из возможных имён столбца, существующее в таблице"""
+        key = (table, aliases)
+        if key not in self._resolved:
+            columns = self._columns.get(table, ())
+            self._resolved[key] = next((name for name in aliases if name in columns), None)
+        return self._resolved[key]
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from utils.database.sqlite import COLUMNS_QUERY, VERSION_QUERY
+from utils.schema import EVENT_FIELDS, SchemaCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "schema_cache.json"
+
+
+@pytest.fixture
+def catalog_reads(db):
+    """execute, считающий чтения списка столбцов"""
+    reads = []
+
+    def execute(query, params=None, fetch="all"):
+        if query == COLUMNS_QUERY:
+            reads.append(query)
+        return db._execute(query, params, fetch)
+
+    execute.reads = reads
+    return execute
+
+
+def load(cache_path, execute, tag="sqlite:test"):
+    return SchemaCache(cache_path).load(execute, VERSION_QUERY, COLUMNS_QUERY, tag)
+
+
+def test_load_reads_tables_and_columns(cache_path, catalog_reads):
+    schema = load(cache_path, catalog_reads)
+    assert schema.loaded
+    assert schema.has_table('мероприятия_it')
+    assert schema.events_table() == 'мероприятия_it'
+    assert schema.tables['мероприятия_it'][:3] == ['№', 'Событие', 'DATE']
+    assert cache_path.exists()
+
+
+def test_unchanged_schema_is_read_from_file(cache_path, catalog_reads):
+    load(cache_path, catalog_reads)
+    schema = load(cache_path, catalog_reads)
+    assert schema.has_table('мероприятия_it')
+    assert len(catalog_reads.reads) == 1
+
+
+def test_added_column_invalidates_cache(sqlite_path, cache_path, catalog_reads):
+    assert load(cache_path, catalog_reads).column('мероприятия_it', EVENT_FIELDS['location']) is None
+
+    con = sqlite3.connect(str(sqlite_path))
+    con.execute("ALTER TABLE мероприятия_it ADD COLUMN Место TEXT")
+    con.close()
+
+    schema = load(cache_path, catalog_reads)
+    assert schema.column('мероприятия_it', EVENT_FIELDS['location']) == 'Место'
+    assert len(catalog_reads.reads) == 2
+
+
+def test_cache_of_other_database_is_not_used(cache_path, catalog_reads):
+    load(cache_path, catalog_reads, tag="sqlite:a")
+    load(cache_path, catalog_reads, tag="sqlite:b")
+    assert len(catalog_reads.reads) == 2
@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import threading
+import time
+import tkinter
+import traceback
+from pathlib import Path
+
+DEFAULT_REPORT_DIR = Path(__file__).resolve().parents[2] / ".ui_profile"
+# Профилирование сессии включается переменной окружения (любое значение, кроме 0)
+PROFILE_ENV = "TEST_EXAM_UI_PROFILE"
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def handler_name(func):
+    """Читаемое имя обработчика: Класс.метод, функция или лямбда с местом определения"""
+    # after() оборачивает функцию во вложенную callit: берём исходную из замыкания
+    code = getattr(func, "__code__", None)
+    if code is not None and code.co_name == "callit" and "func" in code.co_freevars:
+        func = func.__closure__[code.co_freevars.index("func")].cell_contents
+        code = getattr(func, "__code__", None)
+
+    owner = getattr(func, "__self__", None)
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if owner is not None and not isinstance(owner, type(sys)) and name:
+        return name if "." in name else f"{type(owner).__name__}.{name}"
+    if name is None:
+        return type(func).__name__
+    if "<lambda>" in name and code is not None:
+        return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    return name
+
+
+class HandlerStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.stalls = 0
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "stalls": self.stalls,
+        }
+
+
+class StallProfiler:
+    """Замер обработчиков Tk (команды, привязки, after) и поиск зависаний интерфейса
+
+    Каждый вызов Python из цикла Tk проходит через tkinter.CallWrapper;
+    профилировщик подменяет его __call__ и измеряет время обработчика.
+    Фоновый поток следит за текущим обработчиком: если он работает
+    дольше threshold, снимается стек главного потока — видно, на какой
+    строке интерфейс стоит, а не только какой обработчик виноват.
+    """
+
+    def __init__(self, threshold=0.05, max_stalls=200, report_dir=DEFAULT_REPORT_DIR):
+        self.threshold = threshold
+        self.max_stalls = max_stalls
+        self.report_dir = Path(report_dir)
+        self.handlers = {}
+        self.stalls = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # Текущий внешний обработчик: (имя, начало, стек или None)
+        self._current = None
+        self._depth = 0
+        self._main_thread = threading.main_thread().ident
+        self._original_call = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def install(self):
+        """Подмена tkinter.CallWrapper.__call__ и запуск фонового наблюдателя"""
+        if self._original_call is not None:
+            return self
+        original = self._original_call = tkinter.CallWrapper.__call__
+        profiler = self
+
+        def __call__(wrapper, *args):
+            return profiler._call(original, wrapper, args)
+
+        tkinter.CallWrapper.__call__ = __call__
+        self._watchdog = threading.Thread(target=self._watch, name="ui-profiler", daemon=True)
+        self._watchdog.start()
+        return self
+
+    def uninstall(self):
+        if self._original_call is not None:
+            tkinter.CallWrapper.__call__ = self._original_call
+            self._original_call = None
+        self._stopped.set()
+
+    def _call(self, original, wrapper, args):
+        # Вложенные вызовы (update() внутри обработчика) входят во внешний
+        outer = self._depth == 0
+        self._depth += 1
+        name = handler_name(wrapper.func)
+        start = time.perf_counter()
+        if outer:
+            self._current = [name, start, None]
+        try:
+            return original(wrapper, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            if outer:
+                stack = self._current[2]
+                self._current = None
+                self._record(name, elapsed, stack)
+
+    def _watch(self):
+        """Снимок стека главного потока, пока обработчик ещё выполняется"""
+        interval = self.threshold / 2
+        while not self._stopped.wait(interval):
+            current = self._current
+            if current is None or current[2] is not None:
+                continue
+            if time.perf_counter() - current[1] < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._main_thread)
+            if frame is not None:
+                current[2] = "".join(traceback.format_stack(frame))
+
+    def _record(self, name, elapsed, stack):
+        with self._lock:
+            stats = self.handlers.get(name)
+            if stats is None:
+                stats = self.handlers[name] = HandlerStats()
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            if elapsed < self.threshold:
+                return
+            stats.stalls += 1
+            if len(self.stalls) < self.max_stalls:
+                self.stalls.append({
+                    "time": time.time(),
+                    "handler": name,
+                    "ms": round(elapsed * 1000, 3),
+                    "stack": stack,
+                })
+        print(f"Интерфейс не отвечал {elapsed * 1000:.0f} мс: {name}")
+
+    def report(self):
+        """Отчёт за сессию: обработчики по суммарному времени и список зависаний"""
+        with self._lock:
+            handlers = sorted(((name, stats.snapshot()) for name, stats in self.handlers.items()),
+                              key=lambda item: -item[1]["total_ms"])
+            return {
+                "started": self.started,
+                "finished": time.time(),
+                "threshold_ms": self.threshold * 1000,
+                "handlers": dict(handlers),
+                "stalls": list(self.stalls),
+            }
+
+    def summary(self, top=5):
+        report = self.report()
+        lines = [f"Зависаний интерфейса (> {report['threshold_ms']:.0f} мс): {len(report['stalls'])}"]
+        for name, stats in list(report["handlers"].items())[:top]:
+            lines.append(f"  {name:50} {stats['count']:6} вызовов  {stats['total_ms']:9.1f} мс  "
+                         f"макс {stats['max_ms']:7.1f} мс  зависаний {stats['stalls']}")
+        return "\n".join(lines)
+
+    def save_report(self):
+        """Запись отчёта сессии в report_dir; возвращает путь"""
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path